@@ -0,0 +1,175 @@
+import numpy as np
+
+from affine_tables import LOWER_ALPHABET
+from alphabet import get_alphabet
+from ngram_engine import encode_letters, ngram_array
+
+# Ймовірність для n-грам, яких немає в референсних таблицях
+FLOOR_PROBABILITY = 1e-6
+
+def keyspace(alphabet=LOWER_ALPHABET):
+    """
+    Повертає масив усіх допустимих ключів (a, b) та масив таблиць дешифрування
+    форми (кількість ключів, m): індекс літери шифротексту -> індекс літери відкритого тексту.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    keys = np.array(alphabet.valid_keys(), dtype=np.int64)
+    a_inv = np.array([alphabet.inverse[a] for a in alphabet.valid_a for b in range(m)], dtype=np.int64)
+    y = np.arange(m, dtype=np.int64)
+    tables = (a_inv[:, None] * (y[None, :] - keys[:, 1:2])) % m
+    return keys, tables.astype(np.uint8)
+
+def reference_log_probs(letter_freq, bigram_freq, alphabet=LOWER_ALPHABET):
+    """
+    Перетворює референсні частоти літер і біграм (словники) у масиви логарифмів
+    ймовірностей довжини m та m*m.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    index = alphabet.index
+
+    letters = np.full(m, FLOOR_PROBABILITY)
+    for char, value in letter_freq.items():
+        if char in index:
+            letters[index[char]] = value
+    letters /= letters.sum()
+
+    bigrams = np.full(m * m, FLOOR_PROBABILITY)
+    total = sum(bigram_freq.values()) or 1
+    for bigram, value in bigram_freq.items():
+        if len(bigram) == 2 and bigram[0] in index and bigram[1] in index:
+            bigrams[index[bigram[0]] * m + index[bigram[1]]] = value / total
+    bigrams /= bigrams.sum()
+
+    return np.log(letters), np.log(bigrams)
+
+def count_matrices(codes, m):
+    """
+    Підраховує за один прохід частоти літер (вектор довжини m)
+    та біграм (матриця m x m) закодованого шифротексту.
+    """
+    letter_counts = ngram_array(codes, 1, m).astype(np.float64)
+    bigram_counts = ngram_array(codes, 2, m).reshape(m, m).astype(np.float64)
+    return letter_counts, bigram_counts
+
+def _cross_correlate(reference, counts_by_a):
+    """
+    Циклічна взаємна кореляція: result[i, s] = sum_x reference[x] * counts_by_a[i, (x + s) % m].
+    """
+    spectrum = np.conj(np.fft.rfft(reference))[None, :] * np.fft.rfft(counts_by_a, axis=1)
+    return np.fft.irfft(spectrum, n=counts_by_a.shape[1], axis=1)
+
+def letter_scores(keys, letter_counts, letter_logp, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Оцінює всі ключі за частотами літер без дешифрування.
+    Для фіксованого a літера шифротексту y = a*x + b = a*(x + s), де s = a^-1 * b,
+    тому оцінки для всіх b — це циклічна кореляція переставлених частот із референсом.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    a_values = np.unique(keys[:, 0])
+    x = np.arange(m)
+    # counts_by_a[i, x] = кількість літери шифротексту a_i * x
+    counts_by_a = letter_counts[(a_values[:, None] * x[None, :]) % m]
+    if method == 'chi2':
+        # sum (O - E)^2 / E = sum O^2 / E - N; для тексту без літер N = 0 і всі оцінки нульові
+        expected = max(letter_counts.sum(), 1) * np.exp(letter_logp)
+        correlation = _cross_correlate(1.0 / expected, counts_by_a ** 2) - letter_counts.sum()
+        correlation = -correlation
+    else:
+        correlation = _cross_correlate(letter_logp, counts_by_a)
+    row = np.searchsorted(a_values, keys[:, 0])
+    # Обернені з таблиці алфавіту; для необоротних a ключів не буває, тож там 0
+    inverse = np.array([a_inv or 0 for a_inv in alphabet.inverse], dtype=np.int64)
+    a_inv = inverse[keys[:, 0]]
+    shift = (a_inv * keys[:, 1]) % m
+    return correlation[row, shift]
+
+def bigram_scores(tables, bigram_counts, bigram_logp, method='loglik'):
+    """
+    Оцінює всі ключі за біграмами без дешифрування: матриця частот біграм шифротексту
+    переставляється відповідно до ключа і порівнюється з референсною матрицею.
+    """
+    m = tables.shape[1]
+    # encrypt[k, x] — літера шифротексту, в яку ключ k переводить літеру x
+    encrypt = np.argsort(tables, axis=1)
+    decrypted = bigram_counts[encrypt[:, :, None], encrypt[:, None, :]]
+    reference = bigram_logp.reshape(m, m)
+    if method == 'chi2':
+        total = bigram_counts.sum()
+        expected = max(total, 1) * np.exp(reference)
+        return -((decrypted ** 2 / expected).sum(axis=(1, 2)) - total)
+    return (decrypted * reference).sum(axis=(1, 2))
+
+def exhaustive_search(cipher_text, letter_freq, bigram_freq, top=5, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Перебирає весь простір афінних ключів і повертає top найкращих
+    у вигляді списку (a, b, оцінка). Шифротекст проходиться лише один раз для підрахунку
+    частот; далі вартість не залежить від довжини тексту.
+    method: 'loglik' (логарифмічна правдоподібність) або 'chi2' (мінус хі-квадрат).
+    Порядок детермінований: за спаданням оцінки, при рівності — за зростанням (a, b).
+    """
+    letter_logp, bigram_logp = reference_log_probs(letter_freq, bigram_freq, alphabet)
+    return search_with_log_probs(cipher_text, letter_logp, bigram_logp, top, method, alphabet)
+
+def search_with_log_probs(cipher_text, letter_logp, bigram_logp, top=5, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Те саме, що exhaustive_search, але з готовими таблицями логарифмів ймовірностей
+    (наприклад, з бінарної моделі мови).
+    """
+    letter_logp = np.asarray(letter_logp, dtype=np.float64)
+    bigram_logp = np.asarray(bigram_logp, dtype=np.float64)
+    codes = encode_letters(cipher_text, alphabet)
+    keys, tables = keyspace(alphabet)
+    letter_counts, bigram_counts = count_matrices(codes, len(alphabet))
+    scores = letter_scores(keys, letter_counts, letter_logp, method, alphabet)
+    scores = scores + bigram_scores(tables, bigram_counts, bigram_logp, method)
+    order = np.lexsort((keys[:, 1], keys[:, 0], -scores))[:top]
+    return [(int(keys[i, 0]), int(keys[i, 1]), float(scores[i])) for i in order]
+
+def score_weights(letter_logp, bigram_logp, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Будує матрицю ваг форми (m + m*m, кількість ключів) для пакетної оцінки.
+    Оцінка ключа лінійна за частотами шифротексту (loglik) або за їх квадратами (chi2),
+    тому оцінки багатьох шифротекстів обчислюються одним множенням матриць.
+    """
+    m = len(alphabet)
+    letter_logp = np.asarray(letter_logp, dtype=np.float64)
+    bigram_logp = np.asarray(bigram_logp, dtype=np.float64).reshape(m, m)
+    keys, tables = keyspace(alphabet)
+    tables = tables.astype(np.int64)
+    if method == 'chi2':
+        # sum O^2 / E = (1 / N) * sum O^2 / p
+        letter_values, bigram_values = np.exp(-letter_logp), np.exp(-bigram_logp)
+    else:
+        letter_values, bigram_values = letter_logp, bigram_logp
+    letter_weights = letter_values[tables].T
+    bigram_weights = bigram_values[tables[:, :, None], tables[:, None, :]].reshape(len(keys), m * m).T
+    return keys, np.vstack((letter_weights, bigram_weights))
+
+def batch_search(cipher_texts, keys, weights, top=5, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Оцінює весь простір ключів для кількох шифротекстів одночасно з готовими вагами
+    (score_weights). Повертає для кожного тексту список (a, b, оцінка), як exhaustive_search.
+    """
+    m = len(alphabet)
+    features = np.zeros((len(cipher_texts), m + m * m))
+    for row, cipher_text in enumerate(cipher_texts):
+        letter_counts, bigram_counts = count_matrices(encode_letters(cipher_text, alphabet), m)
+        features[row, :m] = letter_counts
+        features[row, m:] = bigram_counts.reshape(-1)
+    if method == 'chi2':
+        letter_totals = features[:, :m].sum(axis=1, keepdims=True)
+        bigram_totals = features[:, m:].sum(axis=1, keepdims=True)
+        scaled = features ** 2
+        scaled[:, :m] /= np.maximum(letter_totals, 1)
+        scaled[:, m:] /= np.maximum(bigram_totals, 1)
+        scores = -(scaled @ weights - letter_totals - bigram_totals)
+    else:
+        scores = features @ weights
+    results = []
+    for row in scores:
+        order = np.lexsort((keys[:, 1], keys[:, 0], -row))[:top]
+        results.append([(int(keys[i, 0]), int(keys[i, 1]), float(row[i])) for i in order])
+    return results
@@ -0,0 +1,72 @@
+from functools import lru_cache
+from alphabet import UKRAINIAN, get_alphabet
+
+# Український алфавіт
+LOWER_ALPHABET = UKRAINIAN
+
+@lru_cache(maxsize=None)
+def _build_table(a, b, alphabet, decrypt):
+    """
+    Будує таблицю трансляції (ord -> символ) для малих і великих літер алфавіту.
+    """
+    m = alphabet.m
+    if decrypt:
+        a_inv = alphabet.modinv(a)
+        if a_inv is None:
+            return None
+        images = [alphabet[(a_inv * (y - b)) % m] for y in range(m)]
+    else:
+        images = [alphabet[(a * x + b) % m] for x in range(m)]
+    table = {}
+    to_upper = alphabet.to_upper
+    for char, image in zip(alphabet, images):
+        # Символи без великої форми (апостроф) мають лише один запис
+        if to_upper[char] != char:
+            table[ord(to_upper[char])] = to_upper[image]
+        table[ord(char)] = image
+    return table
+
+def get_encrypt_table(a, b, alphabet=LOWER_ALPHABET):
+    """
+    Повертає (з кешу) таблицю трансляції для шифрування ключем (a, b).
+    """
+    alphabet = get_alphabet(alphabet)
+    return _build_table(a % alphabet.m, b % alphabet.m, alphabet, False)
+
+def get_decrypt_table(a, b, alphabet=LOWER_ALPHABET):
+    """
+    Повертає (з кешу) таблицю трансляції для дешифрування ключем (a, b)
+    або None, якщо a не має оберненого за модулем m.
+    """
+    alphabet = get_alphabet(alphabet)
+    return _build_table(a % alphabet.m, b % alphabet.m, alphabet, True)
+
+def valid_keys(alphabet=LOWER_ALPHABET):
+    """
+    Повертає всі допустимі ключі (a, b), де a взаємно просте з m.
+    """
+    return get_alphabet(alphabet).valid_keys()
+
+def warm_cache(alphabet=LOWER_ALPHABET):
+    """
+    Заздалегідь будує таблиці шифрування та дешифрування для всіх допустимих ключів.
+    """
+    for a, b in valid_keys(alphabet):
+        get_encrypt_table(a, b, alphabet)
+        get_decrypt_table(a, b, alphabet)
+
+def translate_encrypt(text, a, b, alphabet=LOWER_ALPHABET):
+    """
+    Шифрує текст афінним шифром за один лінійний прохід.
+    """
+    return text.translate(get_encrypt_table(a, b, alphabet))
+
+def translate_decrypt(text, a, b, alphabet=LOWER_ALPHABET):
+    """
+    Дешифрує текст афінним шифром за один лінійний прохід.
+    Повертає None, якщо a не має оберненого за модулем m.
+    """
+    table = get_decrypt_table(a, b, alphabet)
+    if table is None:
+        return None
+    return text.translate(table)
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+from math import gcd
+import numpy as np
+
+class Alphabet:
+    """
+    Алфавіт шифру з заздалегідь обчисленими таблицями: індекси літер (для обох регістрів),
+    відповідності регістрів, допустимі значення a та мультиплікативні обернені за модулем m.
+    Поводиться як послідовність малих літер: len(), індексування, ітерація, 'char in alphabet'.
+    """
+
+    def __init__(self, letters, name=None):
+        self.letters = tuple(letters)
+        if len(set(self.letters)) != len(self.letters):
+            raise ValueError("Літери алфавіту повторюються.")
+        self.name = name
+        self.m = len(self.letters)
+        # Символи без окремої великої форми (наприклад, апостроф) мають однакові форми
+        self.upper_letters = tuple(
+            char.upper() if len(char.upper()) == 1 else char for char in self.letters)
+        self.index = {char: i for i, char in enumerate(self.letters)}
+        self.case_index = dict(self.index)
+        self.case_index.update({char: i for i, char in enumerate(self.upper_letters)})
+        self.to_lower = {upper: lower for lower, upper in zip(self.letters, self.upper_letters)}
+        self.to_upper = {lower: upper for lower, upper in zip(self.letters, self.upper_letters)}
+        self.letter_set = frozenset(self.letters)
+        self.case_set = frozenset(self.case_index)
+        self.valid_a = tuple(a for a in range(1, self.m) if gcd(a, self.m) == 1)
+        # inverse[a] — обернений до a за модулем m або None
+        self.inverse = tuple(pow(a, -1, self.m) if gcd(a, self.m) == 1 else None for a in range(self.m))
+
+    def __len__(self):
+        return self.m
+
+    def __iter__(self):
+        return iter(self.letters)
+
+    def __getitem__(self, i):
+        return self.letters[i]
+
+    def __contains__(self, char):
+        return char in self.letter_set
+
+    def __eq__(self, other):
+        if isinstance(other, Alphabet):
+            return self.letters == other.letters
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.letters)
+
+    def __repr__(self):
+        return f"Alphabet({''.join(self.letters)!r})"
+
+    def modinv(self, a):
+        """
+        Мультиплікативний обернений до a за модулем m або None.
+        """
+        return self.inverse[a % self.m]
+
+    def valid_keys(self):
+        """
+        Усі допустимі ключі афінного шифру (a, b).
+        """
+        return [(a, b) for a in self.valid_a for b in range(self.m)]
+
+    def clean(self, text, keep='', lower=True):
+        """
+        Залишає в тексті лише літери алфавіту та символи keep. При lower=True текст
+        спершу переводиться в нижній регістр, інакше зберігаються літери обох регістрів.
+        """
+        if lower:
+            text = text.lower()
+        return _clean_pattern(self, keep, lower).sub('', text)
+
+    def code_table(self, ignore_case=True):
+        """
+        Таблиця NumPy: код символу Unicode -> індекс літери або -1.
+        """
+        return _code_table(self, ignore_case)
+
+@lru_cache(maxsize=None)
+def _clean_pattern(alphabet, keep, lower):
+    chars = alphabet.letters if lower else alphabet.letters + alphabet.upper_letters
+    return re.compile('[^' + re.escape(''.join(chars) + keep) + ']+')
+
+@lru_cache(maxsize=None)
+def _code_table(alphabet, ignore_case):
+    mapping = alphabet.case_index if ignore_case else alphabet.index
+    table = np.full(max(ord(char) for char in mapping) + 1, -1, dtype=np.int16)
+    for char, index in mapping.items():
+        table[ord(char)] = index
+    return table
+
+UKRAINIAN = Alphabet('абвгґдеєжзиіїйклмнопрстуфхцчшщьюя', 'uk')
+
+# Український алфавіт з апострофом як окремим символом
+UKRAINIAN_APOSTROPHE = Alphabet('абвгґдеєжзиіїйклмнопрстуфхцчшщьюя\'', 'uk-apostrophe')
+
+LATIN = Alphabet('abcdefghijklmnopqrstuvwxyz', 'en')
+
+ALPHABETS = {alphabet.name: alphabet for alphabet in (UKRAINIAN, UKRAINIAN_APOSTROPHE, LATIN)}
+
+def get_alphabet(alphabet):
+    """
+    Повертає Alphabet за назвою ('uk', 'uk-apostrophe', 'en'), з рядка чи списку літер
+    або готовий об'єкт без змін.
+    """
+    if isinstance(alphabet, Alphabet):
+        return alphabet
+    if isinstance(alphabet, str) and alphabet in ALPHABETS:
+        return ALPHABETS[alphabet]
+    return _from_letters(tuple(alphabet))
+
+@lru_cache(maxsize=None)
+def _from_letters(letters):
+    return Alphabet(letters)
@@ -0,0 +1,314 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+import plotting
+import crypto_analysis
+import mono_encrypt
+from cipher_stream import affine_table, open_text, substitution_table, translate_stream
+from corpus_stream import iter_chunks, stream_ngram_array
+from ngram_engine import count_ngrams
+from sizes import format_size, parse_size
+
+# Текст, з якого генеруються синтетичні корпуси
+SEED_CORPUS = 'text1.txt'
+
+# Файли референсних частот, потрібні для повного криптоаналізу
+REFERENCE_FILES = ['freq_reference.json', 'top30_bigrams.json', 'top30_trigrams.json', 'reference_model.bin']
+
+DEFAULT_SIZES = '1KB,10KB,100KB,1MB'
+DEFAULT_OUTPUT = 'bench_results.json'
+
+# Корпуси від цього розміру пишуться у файл і вимірюються потоково, а не рядком у пам'яті
+STREAM_SIZE = 64 << 20
+
+# Допустиме падіння швидкості відносно базового запуску
+DEFAULT_THRESHOLD = 0.2
+
+KNOWN_WORDS = ['і', 'в', 'на', 'що', 'не', 'я', 'з', 'у', 'як', 'та', 'це', 'до', 'то', 'від', 'за', 'по', 'мені', 'ти', 'ми', 'вони']
+
+def iter_corpus(size, seed=0, seed_text=None):
+    """
+    Генерує синтетичний український текст приблизно заданого розміру в байтах UTF-8
+    по рядках: випадково вибрані слова і розділові знаки вихідного корпусу.
+    Останній рядок обрізається так, щоб загальний розмір не перевищував size.
+    """
+    if seed_text is None:
+        with open(SEED_CORPUS, 'r', encoding='utf-8') as f:
+            seed_text = f.read()
+    lines = [line.split() for line in seed_text.splitlines() if line.strip()]
+    words = [word for line in lines for word in line]
+    rng = random.Random(seed)
+    total = 0
+    while total < size:
+        length = len(rng.choice(lines))
+        line = ' '.join(rng.choice(words) for _ in range(max(length, 1))) + '\n'
+        encoded = line.encode('utf-8')
+        if total + len(encoded) > size:
+            line = encoded[:size - total].decode('utf-8', errors='ignore')
+        total += len(encoded)
+        yield line
+
+def generate_corpus(size, seed=0, seed_text=None):
+    """
+    Синтетичний корпус (див. iter_corpus) одним рядком у пам'яті.
+    """
+    return ''.join(iter_corpus(size, seed, seed_text))
+
+def write_corpus(path, size, seed=0, seed_text=None):
+    """
+    Записує той самий корпус, що й generate_corpus, у файл по рядках, не тримаючи
+    його в пам'яті. Повертає кількість символів.
+    """
+    chars = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for line in iter_corpus(size, seed, seed_text):
+            f.write(line)
+            chars += len(line)
+    return chars
+
+def time_call(function, repeat):
+    """
+    Найкращий час виконання з repeat запусків.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def peak_memory(function):
+    """
+    Пікове виділення пам'яті (байти) під час одного виклику за даними tracemalloc.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+@contextlib.contextmanager
+def crack_workspace(cipher_text):
+    """
+    Тимчасовий робочий каталог з шифротекстом і копіями референсних файлів
+    для запуску crypto_analysis.main.
+    """
+    previous = os.getcwd()
+    workspace = tempfile.mkdtemp(prefix='bench_')
+    try:
+        for name in REFERENCE_FILES:
+            if os.path.exists(name):
+                shutil.copy(name, workspace)
+        with open(os.path.join(workspace, 'encrypted_affine.txt'), 'w', encoding='utf-8') as f:
+            f.write(cipher_text)
+        os.chdir(workspace)
+        yield
+    finally:
+        os.chdir(previous)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+def quiet(function):
+    """
+    Обгортка, що приховує виведення функції.
+    """
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+    return run
+
+def benchmark_cases(text):
+    """
+    Повертає список (назва, функція без аргументів) для всіх гарячих шляхів на даному тексті.
+    """
+    a, b = 5, 7
+    cleaned = crypto_analysis.clean_text(text)
+    cipher = crypto_analysis.affine_encrypt(cleaned, a, b)
+    decrypted = crypto_analysis.affine_decrypt(cipher, a, b)
+    letters = decrypted.replace(' ', '')
+    random.seed(0)
+    substitution_map = mono_encrypt.generate_substitution_cipher()
+    substituted = mono_encrypt.encrypt_substitution(cleaned, substitution_map)
+    bigram_freq = crypto_analysis.load_frequencies_from_json('top30_bigrams.json')
+    trigram_freq = crypto_analysis.load_frequencies_from_json('top30_trigrams.json')
+
+    def crack(mode):
+        def run():
+            with crack_workspace(cipher):
+                crypto_analysis.main(mode=mode)
+        return quiet(run)
+
+    return [
+        ('clean_text', lambda: crypto_analysis.clean_text(text)),
+        ('affine_encrypt', lambda: crypto_analysis.affine_encrypt(cleaned, a, b)),
+        ('affine_decrypt', lambda: crypto_analysis.affine_decrypt(cipher, a, b)),
+        ('encrypt_substitution', lambda: mono_encrypt.encrypt_substitution(cleaned, substitution_map)),
+        ('decrypt_substitution', lambda: mono_encrypt.decrypt_substitution(substituted, substitution_map)),
+        ('count_ngrams_2', lambda: count_ngrams(letters, 2)),
+        ('count_ngrams_3', lambda: count_ngrams(letters, 3)),
+        ('score_decrypted_text', lambda: crypto_analysis.score_decrypted_text(decrypted, KNOWN_WORDS, bigram_freq, trigram_freq)),
+        ('crack_exhaustive', crack('exhaustive')),
+        ('crack_frequency', crack('frequency')),
+    ]
+
+def translate_file(source_path, target_path, table):
+    """
+    Шифрує файл у файл частинами через translate_stream.
+    """
+    with open_text(source_path, 'r') as source, open_text(target_path, 'w') as target:
+        translate_stream(source, target, table)
+
+def streaming_cases(corpus_path, workspace):
+    """
+    Гарячі шляхи для корпусу у файлі: усе читається частинами (iter_chunks,
+    translate_stream, stream_ngram_array), тож пам'ять не залежить від розміру корпусу.
+    Шифротексти для дешифрування готуються один раз у каталозі workspace.
+    Оцінка тексту та злам потребують усього тексту в пам'яті, тому тут не вимірюються.
+    """
+    a, b = 5, 7
+    random.seed(0)
+    substitution_map = mono_encrypt.generate_substitution_cipher()
+    encrypt_table = affine_table(a, b)
+    decrypt_table = affine_table(a, b, decrypt=True)
+    substitution_encrypt = substitution_table(substitution_map)
+    substitution_decrypt = substitution_table(substitution_map, decrypt=True)
+    output = os.path.join(workspace, 'output.txt')
+    cipher = os.path.join(workspace, 'affine.txt')
+    substituted = os.path.join(workspace, 'substitution.txt')
+    translate_file(corpus_path, cipher, encrypt_table)
+    translate_file(corpus_path, substituted, substitution_encrypt)
+
+    def clean():
+        for chunk in iter_chunks(corpus_path):
+            crypto_analysis.clean_text(chunk)
+
+    return [
+        ('clean_text', clean),
+        ('affine_encrypt', lambda: translate_file(corpus_path, output, encrypt_table)),
+        ('affine_decrypt', lambda: translate_file(cipher, output, decrypt_table)),
+        ('encrypt_substitution', lambda: translate_file(corpus_path, output, substitution_encrypt)),
+        ('decrypt_substitution', lambda: translate_file(substituted, output, substitution_decrypt)),
+        ('count_ngrams_2', lambda: stream_ngram_array(corpus_path, 2)),
+        ('count_ngrams_3', lambda: stream_ngram_array(corpus_path, 3)),
+    ]
+
+def run_benchmarks(sizes, repeat=3, only=None, seed=0, stream_size=STREAM_SIZE):
+    """
+    Виконує всі бенчмарки для кожного розміру корпусу та повертає список результатів.
+    Корпуси від stream_size байтів генеруються у тимчасовий файл і вимірюються
+    через потокові читачі (streaming_cases) замість рядка в пам'яті.
+    """
+    with open(SEED_CORPUS, 'r', encoding='utf-8') as f:
+        seed_text = f.read()
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='bench_') as workspace:
+            if size >= stream_size:
+                corpus_path = os.path.join(workspace, 'corpus.txt')
+                chars = write_corpus(corpus_path, size, seed, seed_text)
+                cases = streaming_cases(corpus_path, workspace)
+            else:
+                text = generate_corpus(size, seed, seed_text)
+                chars = len(text)
+                cases = benchmark_cases(text)
+            results.extend(run_cases(cases, size, chars, repeat, only))
+    return results
+
+def run_cases(cases, size, chars, repeat=3, only=None):
+    """
+    Вимірює час і пікову пам'ять кожного бенчмарку для корпусу з chars символів.
+    """
+    results = []
+    for name, function in cases:
+        if only and name not in only:
+            continue
+        seconds = time_call(function, repeat)
+        peak = peak_memory(function)
+        result = {
+            'name': name,
+            'size': format_size(size),
+            'chars': chars,
+            'seconds': seconds,
+            'chars_per_sec': chars / seconds if seconds else float('inf'),
+            'peak_bytes': peak,
+        }
+        results.append(result)
+        print(f"{name:22} {result['size']:>6}  {seconds * 1000:10.2f} мс  "
+              f"{result['chars_per_sec'] / 1e6:9.2f} млн симв/с  {peak / (1 << 20):9.2f} МБ")
+    return results
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Порівнює результати з базовими та повертає список регресій: випадки, де швидкість
+    впала більш ніж на threshold (частка).
+    """
+    reference = {(item['name'], item['size']): item for item in baseline.get('results', [])}
+    regressions = []
+    for item in results:
+        base = reference.get((item['name'], item['size']))
+        if base is None or not base['chars_per_sec']:
+            continue
+        ratio = item['chars_per_sec'] / base['chars_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append((item['name'], item['size'], ratio))
+    return regressions
+
+def main(sizes, output=DEFAULT_OUTPUT, baseline_file=None, repeat=3, only=None, threshold=DEFAULT_THRESHOLD,
+         stream_size=STREAM_SIZE):
+    """
+    Запускає бенчмарки, зберігає результати у JSON та (за потреби) порівнює з базовим запуском.
+    Повертає код завершення: 1, якщо знайдено регресії.
+    """
+    plotting.configure(headless=True)
+    results = run_benchmarks(sizes, repeat, only, stream_size=stream_size)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+    print(f"Результати збережено у файлі '{output}'.")
+
+    if baseline_file:
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, threshold)
+        for name, size, ratio in regressions:
+            print(f"Регресія: {name} ({size}) — {ratio:.0%} від базової швидкості.")
+        if regressions:
+            return 1
+        print("Регресій не виявлено.")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Бенчмарки гарячих шляхів криптоаналізу.')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help='розміри синтетичних корпусів через кому (від 1KB до 1GB)')
+    parser.add_argument('--repeat', type=int, default=3, help='кількість повторів кожного вимірювання')
+    parser.add_argument('--only', default=None, help='назви бенчмарків через кому')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='файл для результатів у JSON')
+    parser.add_argument('--baseline', default=None, help='JSON попереднього запуску для порівняння')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='допустиме падіння швидкості (частка)')
+    parser.add_argument('--stream-size', default=format_size(STREAM_SIZE),
+                        help='корпуси від цього розміру вимірюються потоково з тимчасового файлу')
+    args = parser.parse_args()
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+    sys.exit(main(sizes, args.output, args.baseline, args.repeat, only, args.threshold, parse_size(args.stream_size)))
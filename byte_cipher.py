@@ -0,0 +1,169 @@
+import os
+import sys
+import mmap
+import json
+import time
+import argparse
+import numpy as np
+
+from cipher_stream import affine_table, substitution_table
+
+# Розмір блоку файлу, що обробляється за один раз (у байтах); невеликі блоки
+# залишаються в кеші процесора між кроками обробки
+BLOCK_SIZE = 64 << 10
+
+# Перші байти двобайтових послідовностей UTF-8 для літер українського алфавіту:
+# 0xD0, 0xD1 (кирилиця U+0400–U+047F) та 0xD2 (Ґ, ґ)
+LEAD_MIN = 0xD0
+LEAD_MAX = 0xD2
+
+def byte_table(table):
+    """
+    Перетворює таблицю трансляції str.translate (ord -> символ) у таблицю пар байтів:
+    масив uint16 довжини 65536, де індекс і значення — двобайтові коди UTF-8
+    (старший байт перший). Пари, яких немає в таблиці, відображаються самі на себе.
+    """
+    pairs = np.arange(1 << 16, dtype=np.uint16)
+    for source, image in table.items():
+        source_bytes = chr(source).encode('utf-8')
+        image_bytes = (image if isinstance(image, str) else chr(image)).encode('utf-8')
+        if len(source_bytes) != 2 or len(image_bytes) != 2 or not LEAD_MIN <= source_bytes[0] <= LEAD_MAX:
+            raise ValueError(f"Символи '{chr(source)}' -> '{image_bytes.decode('utf-8')}' "
+                             f"не є двобайтовими літерами UTF-8.")
+        pairs[int.from_bytes(source_bytes, 'big')] = int.from_bytes(image_bytes, 'big')
+    return pairs
+
+def byte_buffers(size):
+    """
+    Робочі масиви для translate_bytes на блоки довжиною до size байтів. Виділяються
+    один раз і повторно використовуються для кожного блоку, тож переклад не створює
+    тимчасових масивів завдовжки з блок.
+    """
+    return {
+        'pairs': np.empty(size, dtype=np.uint16),
+        # Індекси типу intp: np.take з ними не перетворює індекси всередині виклику
+        'codes': np.empty(size, dtype=np.intp),
+        'images': np.empty(size, dtype=np.uint16),
+    }
+
+def translate_bytes(data, pairs, out=None, buffers=None):
+    """
+    Перекладає байти UTF-8 (масив uint8) через таблицю пар. Байти 0xD0–0xD2
+    у коректному UTF-8 завжди є початком символу, тому пари знаходяться без декодування.
+    Решта байтів копіюється без змін. out може збігатися з data (переклад на місці).
+    Останній байт data не повинен бути першим байтом незавершеної пари.
+    buffers — робочі масиви з byte_buffers (щонайменше len(data) - 1 елементів).
+    """
+    if out is None:
+        out = np.empty_like(data)
+    n = len(data) - 1
+    if n < 1:
+        np.copyto(out, data)
+        return out
+    if buffers is None:
+        buffers = byte_buffers(n)
+    work, codes, images = buffers['pairs'][:n], buffers['codes'][:n], buffers['images'][:n]
+    # Образ пари байтів, що починається в кожній позиції; пари без першого байта літери
+    # таблиця відображає самі на себе
+    np.copyto(work, data[:-1])
+    np.left_shift(work, 8, out=work)
+    np.bitwise_or(work, data[1:], out=work)
+    np.copyto(codes, work)
+    np.take(pairs, codes, out=images, mode='clip')
+    # Байт j змінюється або як перший байт літери (старший байт образу пари j), або як
+    # другий (молодший байт образу пари j - 1), але не обидва; інакше обидва дорівнюють
+    # data[j]. Тож out[j] = images[j - 1] + (images[j] >> 8) - data[j] за модулем 256
+    # (старший байт images[j - 1] відкидається при записі в uint8) — без масок.
+    # Кожен байт data читається до запису того самого байта out, тож out може бути data
+    work = work[:n - 1]
+    np.right_shift(images[1:], 8, out=work)
+    np.add(work, images[:-1], out=work)
+    np.subtract(work, data[1:n], out=out[1:n], casting='unsafe')
+    out[0] = images[0] >> 8
+    out[n] = images[n - 1] & 0xFF
+    return out
+
+def _blocks(size, data, block_size):
+    # Межа блоку не повинна розривати пару байтів: переносимо її на один байт уперед
+    start = 0
+    while start < size:
+        end = min(start + block_size, size)
+        if end < size and LEAD_MIN <= data[end - 1] <= LEAD_MAX:
+            end += 1
+        yield start, end
+        start = end
+
+def translate_file(input_path, output_path, pairs, block_size=BLOCK_SIZE):
+    """
+    Шифрує або дешифрує файл без декодування в str: вхід відображається в пам'ять,
+    вихід — заздалегідь виділений файл того ж розміру, також відображений у пам'ять.
+    Якщо output_path дорівнює None, файл змінюється на місці. Повертає кількість байтів.
+    """
+    in_place = output_path is None
+    size = os.path.getsize(input_path)
+    if size == 0:
+        if not in_place:
+            open(output_path, 'wb').close()
+        return 0
+    with open(input_path, 'r+b' if in_place else 'rb') as source:
+        source_map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_WRITE if in_place else mmap.ACCESS_READ)
+        try:
+            data = np.frombuffer(source_map, dtype=np.uint8)
+            buffers = byte_buffers(block_size + 1)
+            if in_place:
+                for start, end in _blocks(size, data, block_size):
+                    block = data[start:end]
+                    translate_bytes(block, pairs, block, buffers)
+                del block
+                source_map.flush()
+            else:
+                with open(output_path, 'w+b') as target:
+                    target.truncate(size)
+                    target_map = mmap.mmap(target.fileno(), size)
+                    try:
+                        out = np.frombuffer(target_map, dtype=np.uint8)
+                        for start, end in _blocks(size, data, block_size):
+                            translate_bytes(data[start:end], pairs, out[start:end], buffers)
+                        target_map.flush()
+                    finally:
+                        # Масиви поверх mmap мають бути звільнені до закриття
+                        del out
+                        target_map.close()
+        finally:
+            del data
+            source_map.close()
+    return size
+
+def main(cipher, decrypt, input_path, output_path=None, key=None, map_file=None, block_size=BLOCK_SIZE):
+    """
+    Шифрування або дешифрування файлу на рівні байтів UTF-8 афінним шифром чи шифром підстановки.
+    """
+    if cipher == 'affine':
+        table = affine_table(key[0], key[1], decrypt)
+    else:
+        with open(map_file, 'r', encoding='utf-8') as f:
+            table = substitution_table(json.load(f), decrypt)
+    pairs = byte_table(table)
+    started = time.perf_counter()
+    size = translate_file(input_path, output_path, pairs, block_size)
+    elapsed = time.perf_counter() - started
+    speed = size / elapsed / (1 << 20) if elapsed else float('inf')
+    print(f"Оброблено {size} байтів за {elapsed:.3f} с ({speed:.1f} МБ/с).", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Шифрування файлів на рівні байтів UTF-8 через mmap.')
+    parser.add_argument('cipher', choices=['affine', 'substitution'], help='тип шифру')
+    parser.add_argument('input', help='вхідний файл')
+    parser.add_argument('output', nargs='?', default=None, help='вихідний файл (без нього — на місці)')
+    parser.add_argument('--decrypt', action='store_true', help='дешифрувати замість шифрування')
+    parser.add_argument('--key', type=int, nargs=2, metavar=('A', 'B'), help='ключ афінного шифру')
+    parser.add_argument('--map', default='substitution_map.json', help='JSON з картою підстановки')
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE, help='розмір блоку в байтах')
+    args = parser.parse_args()
+    if args.cipher == 'affine' and args.key is None:
+        parser.error('для афінного шифру потрібен --key A B')
+    try:
+        main(args.cipher, args.decrypt, args.input, args.output, args.key, args.map, args.block_size)
+    except (ValueError, OSError) as e:
+        print(f"Помилка: {e}", file=sys.stderr)
+        sys.exit(1)
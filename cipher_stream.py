@@ -0,0 +1,99 @@
+import sys
+import io
+import json
+import argparse
+from affine_tables import LOWER_ALPHABET, get_encrypt_table, get_decrypt_table
+from corpus_stream import CHUNK_SIZE
+
+def substitution_table(substitution_map, decrypt=False):
+    """
+    Будує таблицю трансляції з карти підстановки (як у mono_encrypt).
+    Для дешифрування карта обертається так само, як у decrypt_substitution.
+    Якщо в карті лише малі літери, великі додаються автоматично.
+    """
+    mapping = dict(substitution_map)
+    for original, image in substitution_map.items():
+        mapping.setdefault(original.upper(), image.upper())
+    if decrypt:
+        mapping = {image: original for original, image in mapping.items()}
+    return str.maketrans(mapping)
+
+def affine_table(a, b, decrypt=False, alphabet=LOWER_ALPHABET):
+    """
+    Повертає таблицю трансляції афінного шифру ключем (a, b).
+    """
+    # Без оберненого до a шифрування не можна було б обернути
+    if get_decrypt_table(a, b, alphabet) is None:
+        raise ValueError(f"a={a} не має оберненого за модулем {len(alphabet)}.")
+    if decrypt:
+        return get_decrypt_table(a, b, alphabet)
+    return get_encrypt_table(a, b, alphabet)
+
+def translate_stream(source, target, table, chunk_size=CHUNK_SIZE):
+    """
+    Перекладає текст з source у target частинами по chunk_size символів.
+    Шифри посимвольні, тому межі частин не впливають на результат,
+    а пам'ять обмежена розміром однієї частини. Повертає кількість символів.
+    """
+    total = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        target.write(chunk.translate(table))
+        total += len(chunk)
+    target.flush()
+    return total
+
+def open_text(path, mode):
+    """
+    Відкриває файл або стандартний потік ('-') як текст UTF-8 без перетворення
+    кінців рядків (newline=''), щоб \\r\\n та \\n зберігалися без змін.
+    """
+    if path == '-':
+        stream = sys.stdin if 'r' in mode else sys.stdout
+        return io.TextIOWrapper(stream.buffer, encoding='utf-8', newline='', write_through=False)
+    return open(path, mode, encoding='utf-8', newline='')
+
+def main(cipher, decrypt, key=None, map_file=None, input_path='-', output_path='-', chunk_size=CHUNK_SIZE):
+    """
+    Потокове шифрування або дешифрування афінним шифром чи шифром підстановки.
+    """
+    if cipher == 'affine':
+        table = affine_table(key[0], key[1], decrypt)
+    else:
+        with open(map_file, 'r', encoding='utf-8') as f:
+            table = substitution_table(json.load(f), decrypt)
+    source = open_text(input_path, 'r')
+    target = open_text(output_path, 'w')
+    try:
+        translate_stream(source, target, table, chunk_size)
+    finally:
+        for stream, path in ((source, input_path), (target, output_path)):
+            if path == '-':
+                # Стандартні потоки не закриваються, лише від'єднуються від обгортки (з flush)
+                stream.detach()
+            else:
+                stream.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Потокове шифрування stdin → stdout з обмеженою пам\'яттю.')
+    parser.add_argument('cipher', choices=['affine', 'substitution'], help='тип шифру')
+    parser.add_argument('--decrypt', action='store_true', help='дешифрувати замість шифрування')
+    parser.add_argument('--key', type=int, nargs=2, metavar=('A', 'B'), help='ключ афінного шифру')
+    parser.add_argument('--map', default='substitution_map.json', help='JSON з картою підстановки')
+    parser.add_argument('--input', default='-', help="вхідний файл ('-' — stdin)")
+    parser.add_argument('--output', default='-', help="вихідний файл ('-' — stdout)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='розмір частини в символах')
+    args = parser.parse_args()
+    if args.cipher == 'affine' and args.key is None:
+        parser.error('для афінного шифру потрібен --key A B')
+    try:
+        main(args.cipher, args.decrypt, args.key, args.map, args.input, args.output, args.chunk_size)
+    except BrokenPipeError:
+        # Наступний етап конвеєра завершився раніше (наприклад, head)
+        sys.stderr.close()
+        sys.exit(0)
+    except (ValueError, OSError) as e:
+        print(f"Помилка: {e}", file=sys.stderr)
+        sys.exit(1)
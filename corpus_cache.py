@@ -0,0 +1,296 @@
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+from corpus_stats import ORDERS, NOT_SEEN, PartialCounts, corpus_counts, write_reference_files
+from corpus_stream import UKRAINIAN_ALPHABET
+from language_model import MODEL_FILE, save_model
+
+# Каталог кешу частот файлів корпусу
+CACHE_DIR = '.corpus_cache'
+
+MANIFEST_FILE = 'manifest.json'
+TOTALS_FILE = 'totals.npz'
+CACHE_VERSION = 2
+
+def file_digest(file_path, block_size=1 << 20):
+    """
+    Обчислює SHA-256 вмісту файлу, читаючи його блоками.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CorpusTotals:
+    """
+    Загальні частоти корпусу як послідовності файлів (за хешами вмісту). Для кожної
+    n-грами замість абсолютної позиції першої появи зберігається номер першого файлу,
+    де вона трапляється (owner, -1 — ніде), і позиція в цьому файлі (local). Вставка
+    чи видалення файлу лише зсуває номери, а абсолютні позиції обчислюються з довжин
+    файлів, тож для оновлення не потрібні часткові частоти решти файлів.
+    """
+
+    def __init__(self, sequence, lengths, counts, owner, local):
+        self.sequence = sequence
+        self.lengths = lengths
+        self.counts = counts
+        self.owner = owner
+        self.local = local
+
+    @classmethod
+    def empty(cls):
+        m = len(UKRAINIAN_ALPHABET)
+        return cls(
+            [],
+            [],
+            [np.zeros(m ** n, dtype=np.int64) for n in ORDERS],
+            [np.full(m ** n, -1, dtype=np.int64) for n in ORDERS],
+            [np.zeros(m ** n, dtype=np.int64) for n in ORDERS],
+        )
+
+    def insert(self, position, digest, partial):
+        """
+        Вставляє файл на позицію position: n-грами, які в ньому є, тепер уперше
+        трапляються в ньому, якщо раніше їх не було в попередніх файлах.
+        """
+        for i in range(len(ORDERS)):
+            self.counts[i] += partial.counts[i]
+            owner = self.owner[i]
+            owner[owner >= position] += 1
+            take = (partial.first[i] != NOT_SEEN) & ((owner < 0) | (owner >= position))
+            owner[take] = position
+            self.local[i][take] = partial.first[i][take]
+        self.sequence.insert(position, digest)
+        self.lengths.insert(position, list(partial.lengths))
+
+    def delete(self, position, load_partial):
+        """
+        Видаляє файл з позиції position. N-грами, що вперше траплялися в ньому, але
+        ще є в корпусі, переходять до першого наступного файлу, де вони є: для цього
+        часткові частоти наступних файлів читаються по черзі, доки всі не знайдено.
+        """
+        partial = load_partial(self.sequence[position])
+        del self.sequence[position]
+        del self.lengths[position]
+        orphans = []
+        for i in range(len(ORDERS)):
+            self.counts[i] -= partial.counts[i]
+            owner = self.owner[i]
+            lost = owner == position
+            owner[owner > position] -= 1
+            owner[lost] = -1
+            orphans.append(lost & (self.counts[i] > 0))
+        for index in range(position, len(self.sequence)):
+            if not any(lost.any() for lost in orphans):
+                break
+            following = load_partial(self.sequence[index])
+            for i in range(len(ORDERS)):
+                found = orphans[i] & (following.first[i] != NOT_SEEN)
+                self.owner[i][found] = index
+                self.local[i][found] = following.first[i][found]
+                orphans[i] &= ~found
+        if any(lost.any() for lost in orphans):
+            raise ValueError("Загальні суми не узгоджуються з частковими частотами файлів.")
+
+    def partial(self):
+        """
+        PartialCounts для всього корпусу з абсолютними позиціями першої появи,
+        як у послідовного підрахунку файлів у порядку послідовності.
+        """
+        lengths = np.array(self.lengths, dtype=np.int64).reshape(-1, len(ORDERS))
+        offsets = np.vstack((np.zeros((1, len(ORDERS)), dtype=np.int64), np.cumsum(lengths, axis=0)))
+        first = []
+        for i in range(len(ORDERS)):
+            owner = self.owner[i]
+            seen = owner >= 0
+            absolute = np.full(len(owner), NOT_SEEN, dtype=np.int64)
+            absolute[seen] = offsets[owner[seen], i] + self.local[i][seen]
+            first.append(absolute)
+        return PartialCounts([counts.copy() for counts in self.counts], first,
+                             [int(length) for length in lengths.sum(axis=0)])
+
+class CorpusCache:
+    """
+    Постійний кеш частот корпусу. Для кожного файлу зберігаються розмір, mtime
+    та SHA-256 вмісту, а часткові частоти — окремо за хешем вмісту.
+    Загальні суми оновлюються додаванням і відніманням частот змінених файлів.
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.stats = {'reused': 0, 'rehashed': 0, 'recounted': 0, 'removed': 0}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load_manifest(self):
+        try:
+            with open(self._path(MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == CACHE_VERSION:
+                return manifest
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return {'version': CACHE_VERSION, 'files': {}}
+
+    def _save_manifest(self):
+        # Запис через тимчасовий файл, щоб перерваний запуск не зіпсував кеш
+        temporary = self._path(MANIFEST_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=4)
+        os.replace(temporary, self._path(MANIFEST_FILE))
+
+    def _load_partial(self, digest):
+        with np.load(self._path(digest + '.npz')) as data:
+            return PartialCounts(
+                [data[f'counts{n}'] for n in ORDERS],
+                [data[f'first{n}'] for n in ORDERS],
+                [int(length) for length in data['lengths']],
+            )
+
+    def _save_partial(self, digest, partial):
+        arrays = {f'counts{n}': counts for n, counts in zip(ORDERS, partial.counts)}
+        arrays.update({f'first{n}': first for n, first in zip(ORDERS, partial.first)})
+        arrays['lengths'] = np.array(partial.lengths, dtype=np.int64)
+        temporary = self._path(digest + '.tmp.npz')
+        np.savez_compressed(temporary, **arrays)
+        os.replace(temporary, self._path(digest + '.npz'))
+
+    def _load_totals(self):
+        try:
+            with np.load(self._path(TOTALS_FILE)) as data:
+                if int(data['version']) != CACHE_VERSION:
+                    return None
+                return CorpusTotals(
+                    [str(digest) for digest in data['sequence']],
+                    data['lengths'].reshape(-1, len(ORDERS)).tolist(),
+                    [data[f'counts{n}'] for n in ORDERS],
+                    [data[f'owner{n}'] for n in ORDERS],
+                    [data[f'local{n}'] for n in ORDERS],
+                )
+        except (FileNotFoundError, KeyError, ValueError):
+            return None
+
+    def _save_totals(self, totals):
+        arrays = {f'counts{n}': counts for n, counts in zip(ORDERS, totals.counts)}
+        arrays.update({f'owner{n}': owner for n, owner in zip(ORDERS, totals.owner)})
+        arrays.update({f'local{n}': local for n, local in zip(ORDERS, totals.local)})
+        # Послідовність хешів, яку описують суми, зберігається разом із ними: суми не
+        # залежать від маніфесту, тож перерваний між двома записами запуск не рахує файл двічі
+        arrays['sequence'] = np.array(totals.sequence, dtype='U64')
+        arrays['lengths'] = np.array(totals.lengths, dtype=np.int64).reshape(-1, len(ORDERS))
+        arrays['version'] = np.array(CACHE_VERSION)
+        temporary = self._path(TOTALS_FILE + '.tmp.npz')
+        np.savez(temporary, **arrays)
+        os.replace(temporary, self._path(TOTALS_FILE))
+
+    def _has_partial(self, digest):
+        return os.path.exists(self._path(digest + '.npz'))
+
+    def update(self, file_paths, workers=1):
+        """
+        Синхронізує кеш зі списком файлів і повертає PartialCounts для всього корпусу.
+        Перераховуються лише нові або змінені файли; файли з тим самим розміром і mtime
+        не читаються взагалі. Кожен шлях враховується один раз. Загальні суми
+        оновлюються лише частковими частотами доданих і видалених файлів.
+        """
+        file_paths = list(dict.fromkeys(file_paths))
+        files = self.manifest['files']
+
+        digests = []
+        for file_path in file_paths:
+            key = os.path.abspath(file_path)
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                print(f"Помилка при обробці файлу {file_path}: {e}")
+                continue
+            record = files.get(key)
+            if record and record['size'] == stat.st_size and record['mtime_ns'] == stat.st_mtime_ns \
+                    and self._has_partial(record['sha256']):
+                self.stats['reused'] += 1
+                digests.append(record['sha256'])
+                continue
+
+            digest = file_digest(file_path)
+            if self._has_partial(digest):
+                self.stats['rehashed'] += 1
+            else:
+                self._save_partial(digest, corpus_counts([file_path], workers))
+                self.stats['recounted'] += 1
+            files[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+            digests.append(digest)
+
+        current = {os.path.abspath(file_path) for file_path in file_paths}
+        for key in [key for key in files if key not in current]:
+            del files[key]
+            self.stats['removed'] += 1
+
+        totals = self._load_totals()
+        try:
+            if totals is None:
+                raise ValueError("Загальні суми відсутні.")
+            self._sync(totals, digests)
+        except (OSError, ValueError):
+            # Суми відсутні або пошкоджені — відновлюємо їх з часткових частот
+            totals = CorpusTotals.empty()
+            self._sync(totals, digests)
+        self._save_totals(totals)
+        self._save_manifest()
+        self._remove_unreferenced()
+        return totals.partial()
+
+    def _sync(self, totals, digests):
+        """
+        Приводить суми до послідовності digests: файли, що зникли або змінилися,
+        видаляються, нові вставляються на свої позиції.
+        """
+        matcher = difflib.SequenceMatcher(None, totals.sequence, digests, autojunk=False)
+        # Правки застосовуються з кінця, тож позиції ще не застосованих правок не зсуваються
+        for tag, old_start, old_end, new_start, new_end in reversed(matcher.get_opcodes()):
+            if tag == 'equal':
+                continue
+            for position in range(old_end - 1, old_start - 1, -1):
+                totals.delete(position, self._load_partial)
+            for offset, digest in enumerate(digests[new_start:new_end]):
+                totals.insert(old_start + offset, digest, self._load_partial(digest))
+
+    def _remove_unreferenced(self):
+        referenced = {record['sha256'] for record in self.manifest['files'].values()}
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz') and name != TOTALS_FILE and name[:-4] not in referenced:
+                os.remove(self._path(name))
+
+def main(file_paths, cache_dir=CACHE_DIR, workers=1, model_file=MODEL_FILE):
+    """
+    Інкрементно перебудовує freq_reference.json, top-30 файли та модель мови:
+    перераховуються лише нові або змінені файли корпусу.
+    """
+    started = time.perf_counter()
+    cache = CorpusCache(cache_dir)
+    partial = cache.update(file_paths, workers)
+    stats = cache.stats
+    print(f"Кеш: повторно використано {stats['reused']}, перевірено за хешем {stats['rehashed']}, "
+          f"перераховано {stats['recounted']}, видалено {stats['removed']} файлів "
+          f"({time.perf_counter() - started:.2f} с).")
+    write_reference_files(partial)
+    if model_file:
+        save_model(model_file, *partial.counts, UKRAINIAN_ALPHABET)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Інкрементне оновлення референсних частот корпусу.')
+    parser.add_argument('files', nargs='+', help='файли корпусу')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='каталог кешу')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='кількість процесів')
+    parser.add_argument('--model', default=MODEL_FILE,
+                        help="файл бінарної моделі мови (порожній рядок — не створювати)")
+    args = parser.parse_args()
+    main(args.files, args.cache_dir, args.workers, args.model)
@@ -0,0 +1,215 @@
+import argparse
+import codecs
+import json
+import multiprocessing
+import os
+import numpy as np
+
+from corpus_stream import UKRAINIAN_ALPHABET
+from language_model import MODEL_FILE, save_model
+from ngram_engine import NgramCounts, encode_letters, first_occurrence, ngram_codes
+
+# Розмір частини великого файлу, яку обробляє один процес (у байтах)
+SHARD_SIZE = 64 << 20
+
+# Розмір блоку читання всередині частини (у байтах)
+READ_SIZE = 1 << 20
+
+# Довжини n-грам, що підраховуються за один прохід
+ORDERS = (1, 2, 3)
+
+NOT_SEEN = np.iinfo(np.int64).max
+
+class PartialCounts:
+    """
+    Часткові частоти літер, біграм і триграм для послідовного фрагмента корпусу:
+    щільні масиви кількостей, позиції першої появи (для порядку, як у Counter)
+    та кількість n-грам кожного порядку у фрагменті.
+    """
+
+    def __init__(self, counts, first, lengths):
+        self.counts = counts
+        self.first = first
+        self.lengths = lengths
+
+    @classmethod
+    def empty(cls):
+        m = len(UKRAINIAN_ALPHABET)
+        return cls(
+            [np.zeros(m ** n, dtype=np.int64) for n in ORDERS],
+            [np.full(m ** n, NOT_SEEN, dtype=np.int64) for n in ORDERS],
+            [0 for _ in ORDERS],
+        )
+
+    def merge(self, right):
+        """
+        Об'єднує з фрагментом, що йде безпосередньо після цього. Операція асоціативна,
+        але не комутативна: порядок першої появи береться з лівого фрагмента.
+        """
+        counts, first = [], []
+        for i in range(len(ORDERS)):
+            counts.append(self.counts[i] + right.counts[i])
+            shifted = np.where(right.first[i] == NOT_SEEN, NOT_SEEN, right.first[i] + self.lengths[i])
+            first.append(np.minimum(self.first[i], shifted))
+        lengths = [left + right_length for left, right_length in zip(self.lengths, right.lengths)]
+        return PartialCounts(counts, first, lengths)
+
+    def ngram_counts(self, n):
+        """
+        Повертає сумісне з Counter подання частот n-грам порядку n.
+        """
+        i = ORDERS.index(n)
+        return NgramCounts.from_array(self.counts[i], UKRAINIAN_ALPHABET, n, self.first[i])
+
+def plan_shards(file_paths, shard_size=SHARD_SIZE):
+    """
+    Розбиває файли на частини не більше shard_size байтів. Межі зсуваються вперед
+    до початку символу UTF-8, щоб не розрізати двобайтові літери.
+    """
+    shards = []
+    for file_path in file_paths:
+        try:
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            print(f"Помилка при обробці файлу {file_path}: {e}")
+            continue
+        boundaries = [0]
+        with open(file_path, 'rb') as file:
+            for candidate in range(shard_size, size, shard_size):
+                file.seek(candidate)
+                # Байти виду 10xxxxxx є продовженням символу
+                while candidate < size and (file.read(1)[0] & 0xC0) == 0x80:
+                    candidate += 1
+                if candidate > boundaries[-1]:
+                    boundaries.append(candidate)
+        boundaries.append(size)
+        shards.extend((file_path, start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start or size == 0)
+    return shards
+
+def _read_letters(file, decoder, limit=None, max_letters=None):
+    """
+    Читає з файлу (до limit байтів або до max_letters літер) та повертає
+    закодовані літери частинами.
+    """
+    remaining = limit
+    collected = 0
+    while remaining is None or remaining > 0:
+        size = READ_SIZE if remaining is None else min(READ_SIZE, remaining)
+        data = file.read(size)
+        if remaining is not None:
+            remaining -= len(data)
+        final = not data or remaining == 0
+        codes = encode_letters(decoder.decode(data, final=final), UKRAINIAN_ALPHABET)
+        if max_letters is not None:
+            codes = codes[:max_letters - collected]
+        collected += len(codes)
+        yield codes
+        if not data or (max_letters is not None and collected >= max_letters):
+            break
+
+def count_shard(shard):
+    """
+    Підраховує літери, біграми та триграми, що починаються в частині файлу.
+    Для n-грам на правій межі частини дочитується max(ORDERS)-1 наступних літер.
+    """
+    file_path, start, end = shard
+    partial = PartialCounts.empty()
+    m = len(UKRAINIAN_ALPHABET)
+    carries = [np.zeros(0, dtype=np.uint8) for _ in ORDERS]
+
+    def feed(chunk, lookahead=False):
+        for i, n in enumerate(ORDERS):
+            # Останні n-1 літер попереднього блоку переносяться, щоб не втратити n-грами на межі
+            codes = np.concatenate((carries[i], chunk[:n - 1] if lookahead else chunk))
+            _accumulate(partial, i, ngram_codes(codes, n, m), m ** n)
+            carries[i] = codes[len(codes) - n + 1:] if n > 1 else codes[:0]
+
+    try:
+        with open(file_path, 'rb') as file:
+            file.seek(start)
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for chunk in _read_letters(file, decoder, limit=end - start):
+                feed(chunk)
+            # Літери після кінця частини: лише для n-грам, що в ній починаються
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            tail = list(_read_letters(file, decoder, max_letters=max(ORDERS) - 1))
+    except Exception as e:
+        print(f"Помилка при обробці файлу {file_path}: {e}")
+        return PartialCounts.empty()
+    if tail:
+        feed(np.concatenate(tail), lookahead=True)
+    return partial
+
+def _accumulate(partial, i, grams, size):
+    partial.counts[i] += np.bincount(grams, minlength=size)
+    if len(grams):
+        chunk_first = first_occurrence(grams, size)
+        new = (chunk_first < len(grams)) & (partial.first[i] == NOT_SEEN)
+        partial.first[i][new] = chunk_first[new] + partial.lengths[i]
+    partial.lengths[i] += len(grams)
+
+def tree_reduce(partials):
+    """
+    Попарно об'єднує сусідні часткові результати, доки не залишиться один.
+    """
+    if not partials:
+        return PartialCounts.empty()
+    while len(partials) > 1:
+        merged = [left.merge(right) for left, right in zip(partials[0::2], partials[1::2])]
+        if len(partials) % 2:
+            merged.append(partials[-1])
+        partials = merged
+    return partials[0]
+
+def corpus_counts(file_paths, workers=1, shard_size=SHARD_SIZE):
+    """
+    Підраховує літери, біграми та триграми всіх файлів. При workers > 1 частини
+    обробляються в пулі процесів (map), а результати об'єднуються деревоподібно (reduce).
+    """
+    shards = plan_shards(file_paths, shard_size)
+    if workers > 1 and len(shards) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            partials = pool.map(count_shard, shards)
+    else:
+        partials = [count_shard(shard) for shard in shards]
+    return tree_reduce(partials)
+
+def save_frequencies_to_json(data, filename):
+    """
+    Зберігає частоти в JSON файл.
+    """
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    print(f"Частоти збережено у файлі '{filename}'.")
+
+def write_reference_files(partial):
+    """
+    Записує freq_reference.json, top30_bigrams.json та top30_trigrams.json
+    у тому ж форматі, що й task1/task2/task3.
+    """
+    letters = partial.ngram_counts(1)
+    total = letters.total()
+    save_frequencies_to_json({letter: count / total for letter, count in letters.items()}, 'freq_reference.json')
+    save_frequencies_to_json(dict(partial.ngram_counts(2).most_common(30)), 'top30_bigrams.json')
+    save_frequencies_to_json(dict(partial.ngram_counts(3).most_common(30)), 'top30_trigrams.json')
+
+def main(file_paths, workers=1, shard_size=SHARD_SIZE, model_file=MODEL_FILE):
+    """
+    Будує всі референсні частоти (літери, біграми, триграми) за один прохід по корпусу
+    та бінарну модель мови з повними таблицями.
+    """
+    partial = corpus_counts(file_paths, workers, shard_size)
+    print(f"Оброблено {partial.lengths[0]} літер у {len(file_paths)} файлах.")
+    write_reference_files(partial)
+    if model_file:
+        save_model(model_file, *partial.counts, UKRAINIAN_ALPHABET)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Частоти літер, біграм і триграм корпусу за один прохід.')
+    parser.add_argument('files', nargs='+', help='файли корпусу')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='кількість процесів')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help='розмір частини файлу в байтах')
+    parser.add_argument('--model', default=MODEL_FILE,
+                        help="файл бінарної моделі мови (порожній рядок — не створювати)")
+    args = parser.parse_args()
+    main(args.files, args.workers, args.shard_size, args.model)
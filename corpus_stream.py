@@ -0,0 +1,79 @@
+import numpy as np
+
+from alphabet import UKRAINIAN
+from ngram_engine import NgramCounts, encode_letters, first_occurrence, ngram_codes
+
+# Український алфавіт
+UKRAINIAN_ALPHABET = UKRAINIAN
+
+# Кількість символів, що зчитуються з файлу за один раз
+CHUNK_SIZE = 1 << 20
+
+def letters_only(text):
+    """
+    Перетворює текст у нижній регістр і залишає лише літери українського алфавіту.
+    Еквівалентно clean_text(text).replace(' ', '') у task1/task2/task3.
+    """
+    return UKRAINIAN_ALPHABET.clean(text)
+
+def iter_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Зчитує файл частинами фіксованого розміру (у символах).
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+def iter_letter_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Зчитує файл частинами фіксованого розміру та повертає очищені частини,
+    що містять лише літери.
+    """
+    for chunk in iter_chunks(file_path, chunk_size):
+        yield letters_only(chunk)
+
+def iter_ngram_codes(file_path, n, chunk_size=CHUNK_SIZE):
+    """
+    Повертає для кожної частини файлу масив кодів n-грам (з основою 33). Останні n-1 літер
+    частини переносяться на початок наступної, тож кожна n-грама тексту з'являється рівно один раз.
+    """
+    m = len(UKRAINIAN_ALPHABET)
+    carry = np.zeros(0, dtype=np.uint8)
+    for chunk in iter_chunks(file_path, chunk_size):
+        # encode_letters сам відкидає все, крім літер, і не враховує регістр
+        codes = np.concatenate((carry, encode_letters(chunk, UKRAINIAN_ALPHABET)))
+        yield ngram_codes(codes, n, m)
+        carry = codes[len(codes) - n + 1:] if n > 1 else codes[:0]
+
+def stream_ngram_counts(file_path, n, chunk_size=CHUNK_SIZE):
+    """
+    Підраховує n-грами файлу потоково. Останні n-1 літер кожної частини переносяться
+    на початок наступної, тому n-грами на межах частин не втрачаються, а пам'ять
+    не залежить від розміру файлу.
+    """
+    counts, first = stream_ngram_array(file_path, n, chunk_size, track_first=True)
+    return NgramCounts.from_array(counts, UKRAINIAN_ALPHABET, n, first)
+
+def stream_ngram_array(file_path, n, chunk_size=CHUNK_SIZE, track_first=False):
+    """
+    Те саме, що stream_ngram_counts, але повертає щільний масив частот довжини 33**n.
+    Якщо track_first, додатково повертає масив позицій першої появи кожної n-грами.
+    """
+    m = len(UKRAINIAN_ALPHABET)
+    counts = np.zeros(m ** n, dtype=np.int64)
+    first = np.full(m ** n, np.iinfo(np.int64).max, dtype=np.int64) if track_first else None
+    offset = 0
+    for grams in iter_ngram_codes(file_path, n, chunk_size):
+        counts += np.bincount(grams, minlength=m ** n)
+        if track_first and len(grams):
+            chunk_first = first_occurrence(grams, m ** n)
+            # Частини обробляються по порядку, тож оновлюємо лише n-грами, що з'явилися вперше
+            new = (chunk_first < len(grams)) & (first == np.iinfo(np.int64).max)
+            first[new] = chunk_first[new] + offset
+        offset += len(grams)
+    if track_first:
+        return counts, first
+    return counts
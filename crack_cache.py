@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Файл кешу результатів зламу
+CACHE_FILE = '.crack_cache.sqlite'
+
+# Найбільша кількість збережених результатів; найдавніше використані витісняються
+MAX_ENTRIES = 10000
+
+# Скільки чекати (с), поки інший процес звільнить базу для запису
+BUSY_TIMEOUT = 30.0
+
+# Файли, від яких залежать результати зламу: їх вміст визначає версію моделі
+REFERENCE_FILES = ('freq_reference.json', 'top30_bigrams.json', 'top30_trigrams.json', 'reference_model.bin')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    model_version TEXT NOT NULL,
+    keys TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STAT_NAMES = ('hits', 'misses', 'stores', 'evictions')
+
+def model_version(file_paths=REFERENCE_FILES):
+    """
+    Версія референсної моделі: SHA-256 вмісту наявних файлів референсних частот.
+    Будь-яка зміна частот робить старі записи кешу недосяжними.
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            continue
+        digest.update(f"{file_path}:{len(content)}:".encode('utf-8'))
+        digest.update(content)
+    return digest.hexdigest()
+
+def cache_key(cleaned_text, version, params=None):
+    """
+    Ключ запису: SHA-256 очищеного шифротексту, версії моделі та параметрів зламу.
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode('ascii'))
+    digest.update(json.dumps(params or {}, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(cleaned_text.encode('utf-8'))
+    return digest.hexdigest()
+
+class CrackCache:
+    """
+    Постійний кеш результатів зламу в SQLite: для кожного шифротексту зберігаються
+    впорядковані ключі з оцінками. Кількість записів обмежена max_entries, зайві
+    витісняються за давністю останнього використання (LRU). Режим WAL дозволяє
+    одночасне читання, а кожен запис — окрема транзакція, тож кеш можна
+    використовувати з кількох процесів.
+    """
+
+    def __init__(self, filename=CACHE_FILE, max_entries=MAX_ENTRIES, version=None):
+        self.filename = filename
+        self.max_entries = max_entries
+        self.version = version if version is not None else model_version()
+        self.connection = sqlite3.connect(filename, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, statements):
+        # BEGIN IMMEDIATE одразу бере блокування запису, тож транзакції різних процесів не конфліктують
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, args in statements:
+                connection.execute(sql, args)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _count(name, amount=1):
+        return ('INSERT INTO stats (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value', (name, amount))
+
+    def get(self, cleaned_text, params=None):
+        """
+        Повертає збережений список (a, b, оцінка) або None, якщо запису немає.
+        """
+        key = cache_key(cleaned_text, self.version, params)
+        row = self.connection.execute('SELECT keys FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._write([self._count('misses')])
+            return None
+        self._write([
+            ('UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?', (time.time(), key)),
+            self._count('hits'),
+        ])
+        return [tuple(entry) for entry in json.loads(row[0])]
+
+    def put(self, cleaned_text, keys, params=None):
+        """
+        Зберігає впорядкований список (a, b, оцінка) і витісняє найдавніше використані записи.
+        """
+        key = cache_key(cleaned_text, self.version, params)
+        now = time.time()
+        value = json.dumps([[int(a), int(b), score] for a, b, score in keys])
+        self._write([
+            ('INSERT INTO results (key, model_version, keys, created, last_used) VALUES (?, ?, ?, ?, ?) '
+             'ON CONFLICT(key) DO UPDATE SET keys = excluded.keys, last_used = excluded.last_used',
+             (key, self.version, value, now, now)),
+            self._count('stores'),
+        ])
+        self.evict()
+
+    def evict(self, max_entries=None):
+        """
+        Видаляє найдавніше використані записи понад max_entries. Повертає кількість видалених.
+        """
+        limit = self.max_entries if max_entries is None else max_entries
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            excess = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0] - limit
+            if excess > 0:
+                connection.execute('DELETE FROM results WHERE key IN '
+                                   '(SELECT key FROM results ORDER BY last_used LIMIT ?)', (excess,))
+                connection.execute(*self._count('evictions', excess))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return max(excess, 0)
+
+    def stats(self):
+        """
+        Лічильники влучань, промахів, збережень і витіснень та кількість записів.
+        """
+        result = dict.fromkeys(STAT_NAMES, 0)
+        result.update(self.connection.execute('SELECT name, value FROM stats').fetchall())
+        result['entries'] = self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        lookups = result['hits'] + result['misses']
+        result['hit_rate'] = result['hits'] / lookups if lookups else 0.0
+        return result
+
+    def clear(self):
+        """
+        Видаляє всі записи та обнуляє статистику.
+        """
+        self._write([('DELETE FROM results', ()), ('DELETE FROM stats', ())])
+
+def print_stats(stats):
+    print(f"Кеш зламу: записів {stats['entries']}, влучань {stats['hits']}, промахів {stats['misses']} "
+          f"(частка влучань {stats['hit_rate']:.1%}), збережень {stats['stores']}, витіснень {stats['evictions']}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Статистика та обслуговування кешу результатів зламу.')
+    parser.add_argument('--cache', default=CACHE_FILE, help='файл кешу')
+    parser.add_argument('--max-entries', type=int, default=None, help='залишити не більше N записів')
+    parser.add_argument('--clear', action='store_true', help='очистити кеш')
+    args = parser.parse_args()
+    if not os.path.exists(args.cache):
+        print(f"Файл '{args.cache}' не знайдено.")
+    else:
+        with CrackCache(args.cache, version='') as cache:
+            if args.clear:
+                cache.clear()
+            if args.max_entries is not None:
+                print(f"Витіснено записів: {cache.evict(args.max_entries)}.")
+            print_stats(cache.stats())
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+import concurrent.futures
+
+from affine_tables import LOWER_ALPHABET, translate_decrypt, valid_keys
+from affine_search import reference_log_probs, score_weights, batch_search
+from cipher_stream import affine_table, substitution_table
+from language_model import MODEL_FILE, load_model
+from ngram_engine import count_ngrams
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8033
+
+# Запити на злам, що надійшли протягом цього часу (с), обробляються одним пакетом
+BATCH_WINDOW = 0.005
+BATCH_SIZE = 64
+
+# Максимальний розмір тіла запиту (байти)
+MAX_BODY = 64 << 20
+
+METHODS = ('loglik', 'chi2')
+
+# Стан процесу-виконавця: модель мови та ваги пакетної оцінки завантажуються один раз
+_worker = {}
+
+def _init_worker(model_file):
+    """
+    Завантажує модель мови (або JSON-частоти) та будує ваги для всіх критеріїв.
+    """
+    model = load_model(model_file) if os.path.exists(model_file) else None
+    if model is not None:
+        # Модель залишається відображеною в пам'ять до завершення процесу
+        _worker['model'] = model
+        letter_logp, bigram_logp = model.letters, model.bigrams
+    else:
+        with open('freq_reference.json', 'r', encoding='utf-8') as f:
+            letter_freq = json.load(f)
+        with open('top30_bigrams.json', 'r', encoding='utf-8') as f:
+            bigram_freq = json.load(f)
+        letter_logp, bigram_logp = reference_log_probs(letter_freq, bigram_freq)
+    _worker['weights'] = {method: score_weights(letter_logp, bigram_logp, method) for method in METHODS}
+
+def crack_batch(texts, top=5, method='loglik'):
+    """
+    Зламує кілька шифротекстів одним пакетом. Для кожного повертає список
+    найкращих ключів з розшифрованим текстом.
+    """
+    keys, weights = _worker['weights'][method]
+    results = batch_search(texts, keys, weights, top, method)
+    return [
+        [{'a': a, 'b': b, 'score': score, 'text': translate_decrypt(text, a, b)} for a, b, score in best]
+        for text, best in zip(texts, results)
+    ]
+
+def cipher_request(request, decrypt):
+    """
+    Шифрує або дешифрує текст: {'cipher': 'affine', 'a', 'b', 'text'}
+    або {'cipher': 'substitution', 'map', 'text'}.
+    """
+    if request.get('cipher', 'affine') == 'affine':
+        table = affine_table(int(request['a']), int(request['b']), decrypt)
+    else:
+        table = substitution_table(request['map'], decrypt)
+    return {'text': request['text'].translate(table)}
+
+def frequency_request(request):
+    """
+    Частоти літер та топ біграм і триграм тексту.
+    """
+    letters = LOWER_ALPHABET.clean(request['text'])
+    top = int(request.get('top', 30))
+    letter_counts = count_ngrams(letters, 1)
+    total = letter_counts.total() or 1
+    return {
+        'letters': {letter: count / total for letter, count in letter_counts.items()},
+        'bigrams': dict(count_ngrams(letters, 2).most_common(top)),
+        'trigrams': dict(count_ngrams(letters, 3).most_common(top)),
+    }
+
+class CrackService:
+    """
+    Локальний сервіс: HTTP/1.1 поверх TCP або Unix-сокета. Обчислення виконуються
+    в пулі процесів, а запити на злам об'єднуються в пакети за методом оцінки.
+    """
+
+    def __init__(self, model_file=MODEL_FILE, workers=None, batch_window=BATCH_WINDOW, batch_size=BATCH_SIZE):
+        self.model_file = model_file
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self.executor = None
+        self.queue = None
+        self.batcher = None
+        self.pending = set()
+        self.stats = {'requests': 0, 'crack_requests': 0, 'batches': 0}
+
+    async def start(self):
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers, initializer=_init_worker, initargs=(self.model_file,))
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        self.batcher.cancel()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def crack(self, text, top=5, method='loglik'):
+        # Некоректні запити відхиляються до постановки в чергу (відповідь 400)
+        if method not in METHODS:
+            raise ValueError(f"Невідомий метод оцінки: {method}.")
+        if not isinstance(text, str):
+            raise ValueError("Поле 'text' має бути рядком.")
+        keyspace = len(valid_keys(LOWER_ALPHABET))
+        if not 1 <= top <= keyspace:
+            raise ValueError(f"Поле 'top' має бути від 1 до {keyspace}.")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, top, method, future))
+        return await future
+
+    async def _batch_loop(self):
+        # Перший запит відкриває вікно; все, що надійшло за batch_window, іде в той самий пакет
+        while True:
+            batch = [await self.queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            groups = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            for (top, method), items in groups.items():
+                self.stats['batches'] += 1
+                # Посилання на задачу зберігається до її завершення
+                task = asyncio.create_task(self._crack_group(items, top, method))
+                self.pending.add(task)
+                task.add_done_callback(self.pending.discard)
+
+    async def _crack_group(self, items, top, method):
+        try:
+            results = await self._run(crack_batch, [item[0] for item in items], top, method)
+        except Exception as e:
+            for item in items:
+                if not item[3].done():
+                    item[3].set_exception(e)
+            return
+        for item, result in zip(items, results):
+            if not item[3].done():
+                item[3].set_result(result)
+
+    async def handle(self, path, request):
+        """
+        Обробляє запит до кінцевої точки та повертає (статус, відповідь).
+        """
+        self.stats['requests'] += 1
+        if not isinstance(request, dict):
+            return 400, {'error': "Тіло запиту має бути об'єктом JSON."}
+        if path == '/health':
+            return 200, {'status': 'ok', **self.stats}
+        if path == '/encrypt':
+            return 200, await self._run(cipher_request, request, False)
+        if path == '/decrypt':
+            return 200, await self._run(cipher_request, request, True)
+        if path == '/frequency':
+            return 200, await self._run(frequency_request, request)
+        if path == '/crack':
+            self.stats['crack_requests'] += 1
+            keys = await self.crack(request['text'], int(request.get('top', 5)), request.get('method', 'loglik'))
+            return 200, {'keys': keys}
+        return 404, {'error': f"Невідома кінцева точка: {path}"}
+
+    async def serve_connection(self, reader, writer):
+        """
+        Обслуговує одне з'єднання HTTP/1.1 (з підтримкою keep-alive).
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {'error': 'Тіло запиту завелике.'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                try:
+                    request = json.loads(body) if body else {}
+                    status, response = await self.handle(path, request)
+                except (KeyError, ValueError, TypeError) as e:
+                    status, response = 400, {'error': str(e)}
+                except Exception as e:
+                    status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, response, keep_alive):
+        body = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}[status]
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, model_file=MODEL_FILE, workers=None):
+    """
+    Запускає сервіс і обслуговує запити до зупинки (Ctrl+C).
+    """
+    service = CrackService(model_file, workers)
+    await service.start()
+    if unix_path:
+        server = await asyncio.start_unix_server(service.serve_connection, unix_path)
+        print(f"Сервіс слухає Unix-сокет '{unix_path}'.")
+    else:
+        server = await asyncio.start_server(service.serve_connection, host, port)
+        print(f"Сервіс слухає http://{host}:{port}.")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Локальний сервіс шифрування та зламу афінного шифру.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='адреса для TCP')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='порт для TCP')
+    parser.add_argument('--unix', default=None, help='шлях до Unix-сокета замість TCP')
+    parser.add_argument('--model', default=MODEL_FILE, help='файл бінарної моделі мови')
+    parser.add_argument('--workers', type=int, default=None, help='кількість процесів-виконавців')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.model, args.workers))
+    except KeyboardInterrupt:
+        print("Сервіс зупинено.", file=sys.stderr)
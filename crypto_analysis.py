@@ -1,40 +1,47 @@
+import os
 import sys
-from math import gcd
-from collections import Counter
+import argparse
+import heapq
+import math
 import json
-import re
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
+import plotting
+import instrumentation
+from alphabet import UKRAINIAN, get_alphabet
+from affine_tables import translate_encrypt, translate_decrypt, valid_keys
+from affine_search import exhaustive_search, search_with_log_probs
+from language_model import MODEL_FILE, load_model
+from ngram_engine import count_ngrams
+from word_matcher import word_matcher, load_word_list
+from crack_cache import CACHE_FILE, MAX_ENTRIES, CrackCache, model_version, print_stats
 
 # Український алфавіт
-LOWER_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
+LOWER_ALPHABET = UKRAINIAN
+m = len(LOWER_ALPHABET)  # Розмір алфавіту (33)
 
-UPPER_ALPHABET = [char.upper() for char in LOWER_ALPHABET]
+# Довжина префікса шифротексту на першому раунді відсіювання кандидатів
+SAMPLE_SIZE = 512
 
-ALPHABET = LOWER_ALPHABET + UPPER_ALPHABET
-ALPHABET_SET = set(ALPHABET)
-m = len(LOWER_ALPHABET)  # Розмір алфавіту (33)
+# На кожному раунді залишається 1/HALVING_RATE кандидатів, а префікс зростає в HALVING_RATE разів
+HALVING_RATE = 2
+
+# Скільки кандидатів (у кратних top) залишається до повного дешифрування: оцінки на
+# коротких префіксах шумні, тож запас не дає відкинути ключі з кінця рейтингу
+SURVIVOR_FACTOR = 4
 
 def clean_text(text):
     """
     Очищає текст: перетворює у нижній регістр та видаляє всі символи, крім літер українського алфавіту,
     пробілів та переносів рядків.
     """
-    text = text.lower()
-    allowed_chars = set(LOWER_ALPHABET + [' ', '\n'])
-    cleaned = ''.join(char for char in text if char in allowed_chars)
-    return cleaned
+    return LOWER_ALPHABET.clean(text, keep=' \n')
 
 def modinv(a, m):
     """
     Обчислює мультиплікативний обернений до a за модулем m.
+    Для розміру алфавіту береться з готової таблиці обернених.
     """
+    if m == LOWER_ALPHABET.m:
+        return LOWER_ALPHABET.modinv(a)
     g, x, y = extended_gcd(a, m)
     if g != 1:
         return None
@@ -56,45 +63,14 @@ def affine_encrypt(plain, a, b):
     Шифрує текст за допомогою афінного шифру, зберігаючи регістр літер,
     пробіли та переноси рядків.
     """
-    encrypted = ''
-    for char in plain:
-        if char in LOWER_ALPHABET:
-            x = LOWER_ALPHABET.index(char)
-            y = (a * x + b) % m
-            encrypted_char = LOWER_ALPHABET[y]
-            encrypted += encrypted_char
-        elif char in UPPER_ALPHABET:
-            x = UPPER_ALPHABET.index(char)
-            y = (a * x + b) % m
-            encrypted_char = UPPER_ALPHABET[y]
-            encrypted += encrypted_char
-        else:
-            encrypted += char  # Залишаємо пробіли, переноси та інші символи без змін
-    return encrypted
+    return translate_encrypt(plain, a, b, LOWER_ALPHABET)
 
 def affine_decrypt(cipher, a, b):
     """
     Дешифрує текст за допомогою афінного шифру, зберігаючи регістр літер,
     пробіли та переноси рядків.
     """
-    a_inv = modinv(a, m)
-    if a_inv is None:
-        return None
-    decrypted = ''
-    for char in cipher:
-        if char in LOWER_ALPHABET:
-            y = LOWER_ALPHABET.index(char)
-            x = (a_inv * (y - b)) % m
-            decrypted_char = LOWER_ALPHABET[x]
-            decrypted += decrypted_char
-        elif char in UPPER_ALPHABET:
-            y = UPPER_ALPHABET.index(char)
-            x = (a_inv * (y - b)) % m
-            decrypted_char = UPPER_ALPHABET[x]
-            decrypted += decrypted_char
-        else:
-            decrypted += char  # Залишаємо пробіли, переноси та інші символи без змін
-    return decrypted
+    return translate_decrypt(cipher, a, b, LOWER_ALPHABET)
 
 def get_letter_frequencies(text):
     """
@@ -102,8 +78,9 @@ def get_letter_frequencies(text):
     """
     frequencies = {}
     total_letters = 0
+    letters = LOWER_ALPHABET.letter_set
     for char in text:
-        if char in LOWER_ALPHABET:
+        if char in letters:
             char_lower = char
         else:
             continue  # Пропускаємо пробіли та інші символи
@@ -120,13 +97,6 @@ def get_most_frequent_letters(freq_dict, n=5):
     sorted_items = sorted(freq_dict.items(), key=lambda item: item[1], reverse=True)
     return [item[0] for item in sorted_items[:n]]
 
-def count_ngrams(text, n):
-    """
-    Підраховує кількість n-грам в тексті.
-    """
-    ngrams = [text[i:i+n] for i in range(len(text)-n+1)]
-    return Counter(ngrams)
-
 def get_most_frequent_ngrams(counter, n=30):
     """
     Повертає список з n найчастіших n-грам.
@@ -137,6 +107,11 @@ def plot_frequency_graph(frequencies, title='Частоти літер у шиф
     """
     Побудова графіку частот літер у тексті.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     letters = list(frequencies.keys())
     freqs = list(frequencies.values())
 
@@ -149,12 +124,17 @@ def plot_frequency_graph(frequencies, title='Частоти літер у шиф
     plt.ylabel('Частота')
     plt.title(title)
     plt.grid(axis='y', alpha=0.75)
-    plt.show()
+    plotting.show('plot_frequency_graph')
 
 def plot_ngrams(ngrams, frequencies, title):
     """
     Побудова графіку частот n-грам.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     plt.figure(figsize=(20, 10))
     sns.barplot(x=ngrams, y=frequencies, palette='viridis', edgecolor='black')
     plt.title(title)
@@ -162,7 +142,7 @@ def plot_ngrams(ngrams, frequencies, title):
     plt.ylabel('Частота')
     plt.xticks(rotation=90)
     plt.tight_layout()
-    plt.show()
+    plotting.show('plot_ngrams')
 
 def save_frequencies_to_json(data, filename):
     """
@@ -186,19 +166,17 @@ def load_frequencies_from_json(filename):
 
 def contains_known_words(text, word_list):
     """
-    Перевіряє, чи містить текст відомі слова з word_list.
+    Перевіряє, чи містить текст відомі слова з word_list (список або WordMatcher).
     """
-    words = re.findall(r'\b\w+\b', text.lower())
-    for word in words:
-        if word in word_list:
-            return True
-    return False
+    return word_matcher(word_list).contains(text)
 
 def find_possible_keys(alphabet, cipher_freq_letters, language_freq_letters):
     """
     Знаходить можливі ключі на основі найчастіших літер.
     Використовує set для уникнення дублікатів.
     """
+    alphabet = get_alphabet(alphabet)
+    index, m = alphabet.index, alphabet.m
     possible_keys = set()
     for y1_char in cipher_freq_letters:
         for y2_char in cipher_freq_letters:
@@ -208,22 +186,17 @@ def find_possible_keys(alphabet, cipher_freq_letters, language_freq_letters):
                 for x2_char in language_freq_letters:
                     if x1_char == x2_char:
                         continue
-                    try:
-                        y1 = LOWER_ALPHABET.index(y1_char)
-                        y2 = LOWER_ALPHABET.index(y2_char)
-                        x1 = LOWER_ALPHABET.index(x1_char)
-                        x2 = LOWER_ALPHABET.index(x2_char)
-                    except ValueError:
+                    y1, y2 = index.get(y1_char), index.get(y2_char)
+                    x1, x2 = index.get(x1_char), index.get(x2_char)
+                    if None in (y1, y2, x1, x2):
                         continue
                     delta_x = (x1 - x2) % m
                     delta_y = (y1 - y2) % m
-                    if gcd(delta_x, m) != 1:
-                        continue
-                    inv_delta_x = modinv(delta_x, m)
+                    inv_delta_x = alphabet.modinv(delta_x)
                     if inv_delta_x is None:
                         continue
                     a_candidate = (delta_y * inv_delta_x) % m
-                    if gcd(a_candidate, m) != 1:
+                    if alphabet.modinv(a_candidate) is None:
                         continue
                     b_candidate = (y1 - a_candidate * x1) % m
                     possible_keys.add((a_candidate, b_candidate))
@@ -232,12 +205,11 @@ def find_possible_keys(alphabet, cipher_freq_letters, language_freq_letters):
 def score_decrypted_text(decrypted_text, known_words, bigram_freq, trigram_freq):
     """
     Оцінює розшифрований текст на основі наявності відомих слів та відповідності біграм і триграм.
+    known_words — список слів або готовий WordMatcher; слово зараховується лише як ціле слово.
     """
     score = 0
-    # Перевірка наявності відомих слів
-    for word in known_words:
-        if word in decrypted_text:
-            score += 1
+    # Кількість різних відомих слів у тексті: один прохід автомата для всього словника
+    score += len(word_matcher(known_words).find_words(decrypted_text))
     # Аналіз біграм
     decrypted_bigrams = count_ngrams(decrypted_text.replace(' ', ''), 2)
     for bg in decrypted_bigrams:
@@ -250,67 +222,155 @@ def score_decrypted_text(decrypted_text, known_words, bigram_freq, trigram_freq)
             score += trigram_freq[tg]
     return score
 
-def main():
-    # Шлях до зашифрованого тексту
-    encrypted_file = 'encrypted_affine.txt'
-    try:
-        with open(encrypted_file, 'r', encoding='utf-8') as f:
-            cipher_text = f.read()
-    except FileNotFoundError:
-        print(f"Файл '{encrypted_file}' не знайдено.")
-        return
-
-    cleaned_cipher = clean_text(cipher_text)
-
+def successive_halving(cipher_text, keys, score_function, top=5, sample=SAMPLE_SIZE, rate=HALVING_RATE,
+                       factor=SURVIVOR_FACTOR):
+    """
+    Відсіює ключі-кандидати послідовним скороченням: усі ключі оцінюються на короткому
+    префіксі шифротексту, далі на кожному раунді залишається 1/rate найкращих (але не менше
+    factor * top), а префікс збільшується в rate разів. Повністю дешифруються лише ті,
+    що залишилися, і з них в обмеженій купі зберігаються top найкращих з додатною оцінкою.
+    Повертає список (a, b, оцінка, розшифрований текст) за спаданням оцінки;
+    при рівних оцінках зберігається порядок keys.
+    """
+    candidates = list(enumerate(keys))
+    length = sample
+    keep = max(top, factor * top)
+    while len(candidates) > keep and length < len(cipher_text):
+        prefix = cipher_text[:length]
+        scored = []
+        for order, (a, b) in candidates:
+            with instrumentation.stage('decrypt'):
+                decrypted_prefix = affine_decrypt(prefix, a, b)
+            with instrumentation.stage('score'):
+                scored.append((score_function(decrypted_prefix), order, (a, b)))
+        instrumentation.count('chars_decrypted', len(prefix) * len(candidates))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        survivors = max(keep, math.ceil(len(candidates) / rate))
+        instrumentation.count('keys_pruned', len(candidates) - survivors)
+        candidates = [(order, key) for _, order, key in scored[:survivors]]
+        length *= rate
+
+    # Мінімальна купа розміру top: (оцінка, -порядок, a, b, текст)
+    heap = []
+    for order, (a, b) in candidates:
+        with instrumentation.stage('decrypt'):
+            decrypted_text = affine_decrypt(cipher_text, a, b)
+        instrumentation.count('chars_decrypted', len(cipher_text))
+        if not decrypted_text:
+            continue
+        with instrumentation.stage('score'):
+            score = score_function(decrypted_text)
+        if score <= 0:
+            continue
+        entry = (score, -order, a, b, decrypted_text)
+        if len(heap) < top:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    return [(a, b, score, text) for score, _, a, b, text in sorted(heap, reverse=True)]
+
+def crack(cleaned_cipher, mode='frequency', method='loglik', dictionary=None, prune=False):
+    """
+    Шукає ключі для очищеного шифротексту: частотний аналіз літер і n-грам (з графіками
+    та JSON-файлами топ-30) і пошук ключів у заданому режимі. Повертає список
+    (a, b, оцінка, розшифрований текст), відсортований за спаданням оцінки.
+    """
     # Частотний аналіз літер
-    cipher_frequencies = get_letter_frequencies(cleaned_cipher)
-    cipher_freq_letters = get_most_frequent_letters(cipher_frequencies, n=5)
+    with instrumentation.stage('letter_frequencies'):
+        cipher_frequencies = get_letter_frequencies(cleaned_cipher)
+        cipher_freq_letters = get_most_frequent_letters(cipher_frequencies, n=5)
     print(f"Найчастіші літери в шифротексті: {cipher_freq_letters}")
 
     # Побудова графіку частот літер
-    plot_frequency_graph(cipher_frequencies)
+    with instrumentation.stage('plots'):
+        plot_frequency_graph(cipher_frequencies)
 
     # Частотний аналіз біграм
-    bigrams = count_ngrams(cleaned_cipher.replace(' ', ''), 2)
-    top_bigrams = get_most_frequent_ngrams(bigrams, n=30)
-    bigram_freq = {bg: freq for bg, freq in top_bigrams}
+    with instrumentation.stage('bigrams'):
+        bigrams = count_ngrams(cleaned_cipher.replace(' ', ''), 2)
+        instrumentation.count('ngrams_counted', bigrams.total())
+        top_bigrams = get_most_frequent_ngrams(bigrams, n=30)
+        bigram_freq = {bg: freq for bg, freq in top_bigrams}
     save_frequencies_to_json(bigram_freq, 'top30_bigrams_encrypted_affine.json')
-    plot_ngrams([bg for bg, _ in top_bigrams], [freq for _, freq in top_bigrams], 'Топ-30 біграм у шифротексті')
+    with instrumentation.stage('plots'):
+        plot_ngrams([bg for bg, _ in top_bigrams], [freq for _, freq in top_bigrams], 'Топ-30 біграм у шифротексті')
 
     # Частотний аналіз триграм
-    trigrams = count_ngrams(cleaned_cipher.replace(' ', ''), 3)
-    top_trigrams = get_most_frequent_ngrams(trigrams, n=30)
-    trigram_freq = {tg: freq for tg, freq in top_trigrams}
+    with instrumentation.stage('trigrams'):
+        trigrams = count_ngrams(cleaned_cipher.replace(' ', ''), 3)
+        instrumentation.count('ngrams_counted', trigrams.total())
+        top_trigrams = get_most_frequent_ngrams(trigrams, n=30)
+        trigram_freq = {tg: freq for tg, freq in top_trigrams}
     save_frequencies_to_json(trigram_freq, 'top30_trigrams_encrypted_affine.json')
-    plot_ngrams([tg for tg, _ in top_trigrams], [freq for _, freq in top_trigrams], 'Топ-30 триграм у шифротексті')
+    with instrumentation.stage('plots'):
+        plot_ngrams([tg for tg, _ in top_trigrams], [freq for _, freq in top_trigrams], 'Топ-30 триграм у шифротексті')
 
     # Завантаження референсних частот біграм та триграм
     # Припустимо, вони збережені у файлах 'top30_bigrams.json' та 'top30_trigrams.json'
-    ref_bigram_freq = load_frequencies_from_json('top30_bigrams.json')
-    ref_trigram_freq = load_frequencies_from_json('top30_trigrams.json')
+    with instrumentation.stage('load_reference'):
+        ref_bigram_freq = load_frequencies_from_json('top30_bigrams.json')
+        ref_trigram_freq = load_frequencies_from_json('top30_trigrams.json')
 
     # Найчастіші літери української мови
     language_freq_letters = ['о', 'а', 'і', 'е', 'н', 'т']
 
-    # Знаходження можливих ключів на основі частотного аналізу літер
-    possible_keys = find_possible_keys(LOWER_ALPHABET, cipher_freq_letters, language_freq_letters)
-    print(f"Знайдено {len(possible_keys)} можливих ключів.")
-
-    # Список відомих слів для перевірки
-    known_words = ['і', 'в', 'на', 'що', 'не', 'я', 'з', 'у', 'як', 'та', 'це', 'до', 'то', 'від', 'за', 'по', 'мені', 'ти', 'ми', 'вони']
-
-    # Криптоаналіз: спроба знайти ключі на основі частотного аналізу
-    key_scores = []
-    for a, b in possible_keys:
-        decrypted_text = affine_decrypt(cleaned_cipher, a, b)
-        if decrypted_text:
-            score = score_decrypted_text(decrypted_text, known_words, ref_bigram_freq, ref_trigram_freq)
-            if score > 0:
-                key_scores.append((a, b, score, decrypted_text))
+    if mode == 'exhaustive':
+        # Повний перебір усіх ключів без дешифрування: один підрахунок частот шифротексту
+        with instrumentation.stage('key_search'):
+            if os.path.exists(MODEL_FILE):
+                # Повні таблиці з бінарної моделі мови замість JSON
+                model = load_model(MODEL_FILE)
+                best_keys = search_with_log_probs(cleaned_cipher, model.letters, model.bigrams, top=5, method=method)
+                model.close()
+            else:
+                ref_letter_freq = load_frequencies_from_json('freq_reference.json')
+                best_keys = exhaustive_search(cleaned_cipher, ref_letter_freq, ref_bigram_freq, top=5, method=method)
+            instrumentation.count('keys_tried', len(valid_keys(LOWER_ALPHABET)))
+        print(f"Перевірено {len(valid_keys(LOWER_ALPHABET))} ключів.")
+        with instrumentation.stage('trial_decryption'):
+            key_scores = [(a, b, score, affine_decrypt(cleaned_cipher, a, b)) for a, b, score in best_keys]
+            instrumentation.count('chars_decrypted', len(cleaned_cipher) * len(key_scores))
+    else:
+        # Знаходження можливих ключів на основі частотного аналізу літер
+        with instrumentation.stage('key_generation'):
+            possible_keys = find_possible_keys(LOWER_ALPHABET, cipher_freq_letters, language_freq_letters)
+        print(f"Знайдено {len(possible_keys)} можливих ключів.")
+
+        # Список відомих слів для перевірки
+        known_words = ['і', 'в', 'на', 'що', 'не', 'я', 'з', 'у', 'як', 'та', 'це', 'до', 'то', 'від', 'за', 'по', 'мені', 'ти', 'ми', 'вони']
+        if dictionary:
+            known_words = known_words + load_word_list(dictionary)
+        # Автомат будується один раз для всіх кандидатів
+        known_words = word_matcher(known_words)
+
+        def score_function(text):
+            return score_decrypted_text(text, known_words, ref_bigram_freq, ref_trigram_freq)
+
+        # Криптоаналіз: спроба знайти ключі на основі частотного аналізу
+        key_scores = []
+        with instrumentation.stage('trial_decryption'):
+            instrumentation.count('keys_tried', len(possible_keys))
+            if prune:
+                # Кандидати відсіюються на префіксах; повністю дешифруються лише найкращі
+                key_scores = successive_halving(cleaned_cipher, possible_keys, score_function)
+            else:
+                for a, b in possible_keys:
+                    with instrumentation.stage('decrypt'):
+                        decrypted_text = affine_decrypt(cleaned_cipher, a, b)
+                    instrumentation.count('chars_decrypted', len(cleaned_cipher))
+                    if decrypted_text:
+                        with instrumentation.stage('score'):
+                            score = score_function(decrypted_text)
+                        if score > 0:
+                            key_scores.append((a, b, score, decrypted_text))
 
     # Відсортувати ключі за оцінкою
-    key_scores = sorted(key_scores, key=lambda x: x[2], reverse=True)
+    return sorted(key_scores, key=lambda x: x[2], reverse=True)
 
+def print_keys(key_scores):
+    """
+    Виводить найкращі ключі та розшифровані ними тексти.
+    """
     # Вивести найкращі ключі
     for a, b, score, decrypted_text in key_scores[:5]:  # Вивести топ-5
         print(f"\nМожливий ключ: a = {a}, b = {b}, оцінка = {score}")
@@ -323,5 +383,84 @@ def main():
     else:
         print("Криптоаналіз завершено.")
 
+def main(mode='frequency', method='loglik', dictionary=None, prune=False, cache_file=None,
+         cache_size=MAX_ENTRIES):
+    """
+    Криптоаналіз афінного шифру. Режим 'frequency' перебирає ключі, побудовані
+    з найчастіших літер; режим 'exhaustive' оцінює весь простір ключів у частотній області
+    (method: 'loglik' або 'chi2') і дешифрує лише найкращі з них.
+    dictionary — файл корпусу, слова якого доповнюють список відомих слів.
+    prune — відсіювати кандидатів режиму 'frequency' послідовним скороченням на префіксах.
+    Це евристика, що на коротких чи нетипових префіксах може відкинути справжній ключ,
+    тому за замовчуванням кожен кандидат дешифрується повністю.
+    cache_file — файл кешу результатів (за замовчуванням кеш вимкнено): повторний злам
+    того самого шифротексту з тією самою моделлю одразу бере ключі з кешу, без
+    частотного аналізу та пошуку.
+    """
+    # Шлях до зашифрованого тексту
+    encrypted_file = 'encrypted_affine.txt'
+    with instrumentation.stage('read'):
+        try:
+            with open(encrypted_file, 'r', encoding='utf-8') as f:
+                cipher_text = f.read()
+        except FileNotFoundError:
+            print(f"Файл '{encrypted_file}' не знайдено.")
+            return
+        instrumentation.count('chars_read', len(cipher_text))
+
+    with instrumentation.stage('clean'):
+        cleaned_cipher = clean_text(cipher_text)
+
+    if not cache_file:
+        print_keys(crack(cleaned_cipher, mode, method, dictionary, prune))
+        return
+
+    # Параметри, від яких залежить результат, входять у ключ кешу разом із версією моделі
+    params = {'mode': mode}
+    if mode == 'exhaustive':
+        params['method'] = method
+    else:
+        params['prune'] = prune
+        params['dictionary'] = model_version((dictionary,)) if dictionary else None
+    with CrackCache(cache_file, cache_size) as cache:
+        with instrumentation.stage('cache'):
+            cached_keys = cache.get(cleaned_cipher, params)
+        instrumentation.count('cache_hits' if cached_keys is not None else 'cache_misses')
+        if cached_keys is not None:
+            print("Ключі знайдено в кеші результатів.")
+            with instrumentation.stage('trial_decryption'):
+                key_scores = [(a, b, score, affine_decrypt(cleaned_cipher, a, b)) for a, b, score in cached_keys]
+                instrumentation.count('chars_decrypted', len(cleaned_cipher) * len(key_scores))
+        else:
+            key_scores = crack(cleaned_cipher, mode, method, dictionary, prune)
+            with instrumentation.stage('cache'):
+                cache.put(cleaned_cipher, [(a, b, score) for a, b, score, _ in key_scores], params)
+    print_keys(key_scores)
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Криптоаналіз афінного шифру.')
+    parser.add_argument('--mode', choices=['frequency', 'exhaustive'], default='frequency',
+                        help='спосіб пошуку ключів')
+    parser.add_argument('--score', choices=['loglik', 'chi2'], default='loglik',
+                        help='критерій оцінки ключів у режимі exhaustive')
+    parser.add_argument('--dictionary', default=None,
+                        help='файл корпусу, слова якого доповнюють список відомих слів')
+    parser.add_argument('--prune', action='store_true',
+                        help='відсіювати кандидатів на префіксах шифротексту замість повного дешифрування '
+                             'кожного (швидше, але евристика може відкинути справжній ключ)')
+    parser.add_argument('--cache', nargs='?', const=CACHE_FILE, default=None, metavar='FILE',
+                        help=f"кешувати результати зламу у файлі (без імені файлу — '{CACHE_FILE}')")
+    parser.add_argument('--cache-size', type=int, default=MAX_ENTRIES, help='найбільша кількість записів кешу')
+    parser.add_argument('--cache-stats', action='store_true', help='вивести статистику кешу')
+    plotting.add_arguments(parser)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    plotting.configure(args.headless, args.save_figures)
+    instrumentation.configure(args.stats is not None, args.profile_stage, args.profile_output)
+    main(mode=args.mode, method=args.score, dictionary=args.dictionary, prune=args.prune,
+         cache_file=args.cache, cache_size=args.cache_size)
+    if args.cache_stats and args.cache:
+        with CrackCache(args.cache, args.cache_size) as cache:
+            print_stats(cache.stats())
+    if args.stats is not None:
+        instrumentation.write_report(args.stats)
@@ -1,53 +1,39 @@
 import sys
+import os
+import json
+import argparse
 import random
+import multiprocessing
 from math import gcd
+from alphabet import UKRAINIAN
+from affine_tables import translate_encrypt
 
 # Український алфавіт (тільки малі літери)
-UKRAINIAN_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
+UKRAINIAN_ALPHABET = UKRAINIAN
 
 def clean_text(text):
     """
     Очищає текст: перетворює у нижній регістр та видаляє всі символи,
     крім літер українського алфавіту, пробілів та переносів рядків.
     """
-    allowed_chars = set(UKRAINIAN_ALPHABET + [' ', '\n'])
-    cleaned = ''.join(char for char in text if char.lower() in allowed_chars or char in [' ', '\n'])
-    return cleaned
+    return UKRAINIAN_ALPHABET.clean(text, keep=' \n', lower=False)
 
-def get_affine_keys(m):
+def get_affine_keys(m, rng=random):
     """
     Генерує випадкові ключі a та b для афінного шифру, де a взаємно просте з m.
     """
     while True:
-        a = random.randint(1, m-1)
+        a = rng.randint(1, m-1)
         if gcd(a, m) == 1:
             break
-    b = random.randint(0, m-1)
+    b = rng.randint(0, m-1)
     return a, b
 
 def affine_encrypt(text, a, b, alphabet):
     """
     Шифрує текст за допомогою афінного шифру, зберігаючи регістр літер.
     """
-    m = len(alphabet)
-    encrypted = ''
-    for char in text:
-        if char.lower() in alphabet:
-            is_upper = char.isupper()
-            x = alphabet.index(char.lower())
-            y = (a * x + b) % m
-            encrypted_char = alphabet[y]
-            if is_upper:
-                encrypted_char = encrypted_char.upper()
-            encrypted += encrypted_char
-        else:
-            encrypted += char  # Залишаємо символи, які не в алфавіті (пробіли, перенос рядка, розділові знаки)
-    return encrypted
+    return translate_encrypt(text, a, b, alphabet)
 
 def save_encrypted_text(encrypted_text, a, b):
     """
@@ -80,6 +66,148 @@ def main():
     encrypted_text = affine_encrypt(cleaned_text, a, b, UKRAINIAN_ALPHABET)
     save_encrypted_text(encrypted_text, a, b)
 
+def collect_inputs(source, output_dir=None, manifest_file='keys.json'):
+    """
+    Повертає список завдань {'file', 'a', 'b', 'output'} для пакетного шифрування.
+    source — каталог (усі файли в ньому рекурсивно) або JSON-маніфест: список шляхів
+    чи об'єктів з полем 'file' та необов'язковими 'a', 'b', 'output'.
+    Каталог результатів output_dir і маніфест ключів у ньому не вважаються вхідними
+    файлами, навіть якщо лежать усередині source.
+    """
+    if os.path.isdir(source):
+        excluded = os.path.realpath(output_dir) if output_dir else None
+        if excluded == os.path.realpath(source):
+            raise ValueError(f"Каталог результатів '{output_dir}' збігається з вхідним каталогом.")
+        manifest_path = os.path.join(excluded, manifest_file) if excluded else None
+        entries = []
+        for root, dirs, files in os.walk(source):
+            # Попередні шифротексти не повинні потрапити у вхідні дані наступного запуску
+            dirs[:] = sorted(name for name in dirs if os.path.realpath(os.path.join(root, name)) != excluded)
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if os.path.realpath(path) == manifest_path:
+                    continue
+                entries.append({'file': path, 'output': os.path.relpath(path, source)})
+        return entries
+    with open(source, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(source)
+    entries = []
+    for item in manifest:
+        entry = {'file': item} if isinstance(item, str) else dict(item)
+        if not os.path.isabs(entry['file']):
+            # Як і для каталогу, шифротекст за замовчуванням зберігає відносний шлях,
+            # тож однакові імена з різних підкаталогів не перезаписують одне одного
+            entry.setdefault('output', entry['file'])
+            entry['file'] = os.path.join(base, entry['file'])
+        entries.append(entry)
+    return entries
+
+def assign_keys(entries, shared_key=None, shared=False, keys_per_file=1, seed=None):
+    """
+    Призначає ключі завданням без явного ключа. Якщо задано shared_key або shared,
+    усі файли шифруються одним ключем; інакше кожен файл отримує keys_per_file
+    власних випадкових ключів. Повертає розгорнутий список завдань.
+    Якщо в ключі з маніфесту є лише одне з 'a', 'b' або a не має оберненого, вихідний
+    шлях виходить за межі каталогу результатів або два завдання мають однаковий
+    вихідний файл, — ValueError.
+    """
+    rng = random.Random(seed)
+    m = len(UKRAINIAN_ALPHABET)
+    if shared and shared_key is None:
+        shared_key = get_affine_keys(m, rng)
+    jobs = []
+    outputs = {}
+    for entry in entries:
+        if ('a' in entry) != ('b' in entry):
+            raise ValueError(f"{entry['file']}: ключ має містити обидва значення 'a' та 'b'.")
+        if 'a' in entry:
+            a, b = int(entry['a']), int(entry['b'])
+            if UKRAINIAN_ALPHABET.modinv(a) is None:
+                raise ValueError(f"{entry['file']}: a={a} не є взаємно простим з {m}.")
+            keys = [(a, b % m)]
+        elif shared_key is not None:
+            keys = [tuple(shared_key)]
+        else:
+            keys = [get_affine_keys(m, rng) for _ in range(keys_per_file)]
+        for index, (a, b) in enumerate(keys):
+            output = os.path.normpath(entry.get('output') or os.path.basename(entry['file']))
+            if os.path.isabs(output) or output.split(os.sep)[0] == os.pardir:
+                raise ValueError(f"{entry['file']}: вихідний шлях '{output}' виходить за межі каталогу результатів.")
+            if len(keys) > 1:
+                stem, extension = os.path.splitext(output)
+                output = f"{stem}.{index}{extension}"
+            if output in outputs:
+                raise ValueError(f"Файли {outputs[output]} та {entry['file']} мають однаковий вихідний шлях '{output}'.")
+            outputs[output] = entry['file']
+            jobs.append({'file': entry['file'], 'a': a, 'b': b, 'output': output})
+    return jobs
+
+def _group_by_input(jobs):
+    # Усі ключі одного вхідного файлу обробляються разом: файл читається й очищується один раз
+    groups = {}
+    for job in jobs:
+        groups.setdefault(os.path.abspath(job['file']), []).append(job)
+    return list(groups.values())
+
+def _encrypt_group(task):
+    output_dir, jobs = task
+    input_file = jobs[0]['file']
+    try:
+        with open(input_file, 'r', encoding='utf-8') as file:
+            cleaned_text = clean_text(file.read())
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Помилка при обробці файлу {input_file}: {e}")
+        return []
+    records = []
+    for job in jobs:
+        output_file = os.path.join(output_dir, job['output'])
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as file:
+            file.write(affine_encrypt(cleaned_text, job['a'], job['b'], UKRAINIAN_ALPHABET))
+        records.append({'input': input_file, 'output': output_file, 'a': job['a'], 'b': job['b']})
+    return records
+
+def encrypt_batch(jobs, output_dir, workers=1, manifest_file='keys.json'):
+    """
+    Шифрує всі завдання (у пулі процесів при workers > 1), записує шифротексти
+    в output_dir та єдиний маніфест ключів. Повертає список записів маніфесту.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(output_dir, group) for group in _group_by_input(jobs)]
+    if workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_encrypt_group, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    else:
+        results = [_encrypt_group(task) for task in tasks]
+    records = [record for group in results for record in group]
+    manifest_path = os.path.join(output_dir, manifest_file)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=4)
+    print(f"Зашифровано {len(records)} текстів з {len(tasks)} файлів. Ключі збережено у файлі '{manifest_path}'.")
+    return records
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Шифрування текстів афінним шифром.')
+    parser.add_argument('--batch', metavar='SOURCE', default=None,
+                        help='каталог або JSON-маніфест для пакетного шифрування')
+    parser.add_argument('--output-dir', default='encrypted', help='каталог для шифротекстів')
+    parser.add_argument('--shared-key', action='store_true', help='один випадковий ключ для всіх файлів')
+    parser.add_argument('--key', type=int, nargs=2, metavar=('A', 'B'), default=None,
+                        help='спільний ключ для всіх файлів')
+    parser.add_argument('--keys-per-file', type=int, default=1,
+                        help='кількість різних ключів для кожного файлу')
+    parser.add_argument('--seed', type=int, default=None, help='початкове значення генератора ключів')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='кількість процесів')
+    args = parser.parse_args()
+    if args.batch is None:
+        main()
+    else:
+        if args.key is not None and UKRAINIAN_ALPHABET.modinv(args.key[0]) is None:
+            parser.error(f"a={args.key[0]} не є взаємно простим з {len(UKRAINIAN_ALPHABET)}.")
+        try:
+            jobs = assign_keys(collect_inputs(args.batch, args.output_dir), args.key, args.shared_key, args.keys_per_file, args.seed)
+        except ValueError as e:
+            parser.error(str(e))
+        encrypt_batch(jobs, args.output_dir, args.workers)
     
\ No newline at end of file
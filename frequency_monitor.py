@@ -0,0 +1,290 @@
+import sys
+import json
+import heapq
+import argparse
+from collections import deque
+from functools import lru_cache
+from statistics import NormalDist
+import numpy as np
+
+from affine_tables import LOWER_ALPHABET, translate_decrypt
+from affine_search import reference_log_probs, exhaustive_search
+from alphabet import get_alphabet
+from ngram_engine import encode_letters
+from corpus_stream import iter_chunks
+
+# Кількість останніх літер, за якими рахується статистика
+WINDOW_SIZE = 2000
+
+# Рівень значущості критерію хі-квадрат для сигналу про розбіжність
+ALPHA = 1e-4
+
+# Мінімальна величина розбіжності хі-квадрат / N. Природний текст відхиляється від
+# референсу сильніше, ніж випадкова вибірка (у вікнах text1.txt з 2000 літер — до ~0.1),
+# а найближчий хибний афінний ключ дає ~1.1, тож одного критерію значущості замало
+DRIFT_THRESHOLD = 0.5
+
+# Розбіжність вважається зниклою, коли величина падає нижче цієї частки порогу
+# (гістерезис, щоб стан не перемикався на кожній літері біля порогу)
+RECOVERY_RATIO = 0.5
+
+class FrequencyMonitor:
+    """
+    Частоти літер, біграм і триграм у ковзному вікні останніх window літер потоку.
+    Кожна нова літера оновлює лічильники за O(1): додається вона сама та n-грами,
+    що на ній закінчуються, і видаляються найстаріша літера та n-грами, що з неї починаються.
+    Статистика хі-квадрат відносно очікуваних розподілів (референсного та, якщо задано
+    ключ, референсного, зашифрованого цим ключем) теж оновлюється за O(1).
+    """
+
+    def __init__(self, window=WINDOW_SIZE, reference=None, key=None, alpha=ALPHA, threshold=DRIFT_THRESHOLD,
+                 alphabet=LOWER_ALPHABET):
+        if window < 3:
+            raise ValueError("Вікно має містити щонайменше 3 літери.")
+        self.alphabet = get_alphabet(alphabet)
+        self.window = window
+        self.alpha = alpha
+        self.threshold = threshold
+        self.buffer = deque()
+        self.letters = [0] * self.alphabet.m
+        # Біграми та триграми зберігаються за кодами; нульові записи видаляються,
+        # тож розмір словників не перевищує розміру вікна
+        self.bigrams = {}
+        self.trigrams = {}
+        self.position = 0
+        # Для кожного очікуваного розподілу: обернені ймовірності та сума count^2 / p
+        self.expected = {}
+        self.reference = None
+        self.key = None
+        if reference is not None:
+            self.set_reference(reference)
+        if key is not None:
+            self.set_key(*key)
+        self.drift = {}
+
+    def set_reference(self, letter_freq):
+        """
+        Задає референсні частоти літер (словник, як у freq_reference.json).
+        """
+        letter_logp, _ = reference_log_probs(letter_freq, {}, self.alphabet)
+        self.reference = np.exp(letter_logp).tolist()
+        self._set_expected('reference', self.reference)
+        if self.key is not None:
+            self.set_key(*self.key)
+
+    def set_key(self, a, b):
+        """
+        Задає поточний найкращий ключ афінного шифру: очікуваний розподіл літер
+        шифротексту — референсний, переставлений ключем (y = a*x + b mod m).
+        """
+        if self.reference is None:
+            raise ValueError("Для перевірки ключа потрібні референсні частоти.")
+        if self.alphabet.modinv(a) is None:
+            raise ValueError(f"Значення a = {a} не має оберненого за модулем {self.alphabet.m}.")
+        m = self.alphabet.m
+        expected = [0.0] * m
+        for x, p in enumerate(self.reference):
+            expected[(a * x + b) % m] = p
+        self.key = (a, b)
+        self._set_expected('key', expected)
+
+    def _set_expected(self, name, probabilities):
+        inverse = [1.0 / p for p in probabilities]
+        self.expected[name] = [inverse, sum(c * c * w for c, w in zip(self.letters, inverse))]
+
+    def _add_letter(self, x, step):
+        count = self.letters[x]
+        # (c + 1)^2 - c^2 = 2c + 1; c^2 - (c - 1)^2 = 2c - 1
+        delta = 2 * count + step
+        for entry in self.expected.values():
+            entry[1] += step * delta * entry[0][x]
+        self.letters[x] = count + step
+
+    @staticmethod
+    def _add_ngram(table, code, step):
+        count = table.get(code, 0) + step
+        if count:
+            table[code] = count
+        else:
+            del table[code]
+
+    def update(self, x):
+        """
+        Додає в потік літеру з індексом x (0..m-1).
+        """
+        m = self.alphabet.m
+        buffer = self.buffer
+        if len(buffer) == self.window:
+            oldest = buffer.popleft()
+            self._add_letter(oldest, -1)
+            self._add_ngram(self.bigrams, oldest * m + buffer[0], -1)
+            self._add_ngram(self.trigrams, (oldest * m + buffer[0]) * m + buffer[1], -1)
+        if buffer:
+            self._add_ngram(self.bigrams, buffer[-1] * m + x, 1)
+            if len(buffer) > 1:
+                self._add_ngram(self.trigrams, (buffer[-2] * m + buffer[-1]) * m + x, 1)
+        buffer.append(x)
+        self._add_letter(x, 1)
+        self.position += 1
+
+    def feed(self, text):
+        """
+        Додає в потік усі літери тексту (інші символи ігноруються) і повертає список подій
+        зміни стану: (позиція, розподіл, статистика, True — розбіжність почалася / False — зникла).
+        """
+        events = []
+        for x in encode_letters(text, self.alphabet).tolist():
+            self.update(x)
+            if len(self.buffer) == self.window:
+                for name in self.expected:
+                    drifting = self.drift.get(name, False)
+                    if self.is_drifting(name, drifting) != drifting:
+                        self.drift[name] = not drifting
+                        events.append((self.position, name, self.chi_square(name), not drifting))
+        return events
+
+    def is_drifting(self, name='reference', drifting=False):
+        """
+        Чи не відповідають частоти вікна розподілу name: хі-квадрат перевищує критичне
+        значення і хі-квадрат / N перевищує threshold. Якщо розбіжність уже є (drifting),
+        вона зберігається, доки хі-квадрат / N не впаде нижче RECOVERY_RATIO * threshold.
+        """
+        statistic = self.chi_square(name)
+        limit = self.threshold * (RECOVERY_RATIO if drifting else 1.0)
+        return statistic > self.critical_value() and statistic > limit * len(self.buffer)
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def text(self):
+        """
+        Вміст вікна як рядок літер.
+        """
+        letters = self.alphabet.letters
+        return ''.join(letters[x] for x in self.buffer)
+
+    def _decode(self, code, n):
+        chars = []
+        for _ in range(n):
+            code, index = divmod(code, self.alphabet.m)
+            chars.append(self.alphabet[index])
+        return ''.join(reversed(chars))
+
+    def frequencies(self, n=1):
+        """
+        Відносні частоти n-грам (n = 1, 2, 3) у вікні.
+        """
+        if n == 1:
+            total = len(self.buffer) or 1
+            return {self.alphabet[x]: count / total for x, count in enumerate(self.letters) if count}
+        table = self._table(n)
+        total = sum(table.values()) or 1
+        return {self._decode(code, n): count / total for code, count in table.items()}
+
+    def most_common(self, k=10, n=1):
+        """
+        k найчастіших n-грам у вікні: список (n-грама, кількість).
+        """
+        if n == 1:
+            items = ((x, count) for x, count in enumerate(self.letters) if count)
+        else:
+            items = self._table(n).items()
+        return [(self._decode(code, n), count) for code, count in heapq.nlargest(k, items, key=lambda item: item[1])]
+
+    def _table(self, n):
+        if n == 2:
+            return self.bigrams
+        if n == 3:
+            return self.trigrams
+        raise ValueError("Підтримуються лише літери, біграми та триграми (n = 1, 2, 3).")
+
+    def chi_square(self, name='reference'):
+        """
+        Статистика хі-квадрат частот літер вікна відносно розподілу name
+        ('reference' або 'key'): sum (O - E)^2 / E = sum O^2 / (N p) - N.
+        """
+        total = len(self.buffer)
+        if not total:
+            return 0.0
+        return self.expected[name][1] / total - total
+
+    def critical_value(self):
+        """
+        Критичне значення хі-квадрат з m - 1 ступенями свободи для рівня alpha
+        (наближення Вілсона–Гілферті).
+        """
+        return _critical_value(self.alphabet.m - 1, self.alpha)
+
+    def best_key(self, bigram_freq, method='loglik'):
+        """
+        Найкращий афінний ключ для вмісту вікна (пошук у частотній області).
+        """
+        a, b, _ = exhaustive_search(self.text(), dict(zip(self.alphabet, self.reference)),
+                                    bigram_freq, 1, method, self.alphabet)[0]
+        return a, b
+
+@lru_cache(maxsize=None)
+def _critical_value(k, alpha):
+    z = NormalDist().inv_cdf(1 - alpha)
+    return k * (1 - 2 / (9 * k) + z * (2 / (9 * k)) ** 0.5) ** 3
+
+def load_json(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main(input_path='-', window=WINDOW_SIZE, reference_file='freq_reference.json', bigram_file='top30_bigrams.json',
+         key=None, track_key=False, alpha=ALPHA, threshold=DRIFT_THRESHOLD, top=5, report_every=0, chunk_size=4096):
+    """
+    Стежить за потоком шифротексту: повідомляє, коли частоти літер у вікні перестають
+    відповідати референсу або поточному ключу. Якщо track_key, ключ визначається
+    за першим заповненим вікном і перевизначається після кожної розбіжності з ним.
+    """
+    monitor = FrequencyMonitor(window, load_json(reference_file), key, alpha, threshold)
+    bigram_freq = load_json(bigram_file) if track_key else None
+    source = sys.stdin if input_path == '-' else None
+    chunks = iter(lambda: source.read(chunk_size), '') if source else iter_chunks(input_path, chunk_size)
+    next_report = report_every
+    # Ключ перевизначається, щойно вікно заповниться літерами після розбіжності
+    refresh_at = window if track_key and key is None else None
+    for chunk in chunks:
+        for position, name, statistic, drifting in monitor.feed(chunk):
+            label = 'референсом' if name == 'reference' else f"ключем a = {monitor.key[0]}, b = {monitor.key[1]}"
+            if drifting:
+                print(f"[{position}] Розбіжність з {label}: хі-квадрат = {statistic:.1f}, "
+                      f"хі-квадрат / N = {statistic / len(monitor):.3f}.")
+                if name == 'key' and track_key:
+                    refresh_at = position + window
+            else:
+                print(f"[{position}] Частоти знову відповідають {label}: хі-квадрат = {statistic:.1f}.")
+        if refresh_at is not None and monitor.position >= refresh_at:
+            monitor.set_key(*monitor.best_key(bigram_freq))
+            monitor.drift.pop('key', None)
+            refresh_at = None
+            print(f"[{monitor.position}] Поточний ключ: a = {monitor.key[0]}, b = {monitor.key[1]}.")
+        if report_every and monitor.position >= next_report:
+            next_report = monitor.position + report_every
+            letters = ', '.join(f"{char}: {count}" for char, count in monitor.most_common(top))
+            trigrams = ', '.join(f"{gram}: {count}" for gram, count in monitor.most_common(top, 3))
+            print(f"[{monitor.position}] Літери: {letters}; триграми: {trigrams}.")
+            if monitor.key is not None:
+                preview = translate_decrypt(monitor.text()[-60:], *monitor.key)
+                print(f"[{monitor.position}] Дешифровано поточним ключем: {preview}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Частоти n-грам у ковзному вікні потоку шифротексту та виявлення розбіжностей.')
+    parser.add_argument('--input', default='-', help="файл потоку ('-' — стандартний ввід)")
+    parser.add_argument('--window', type=int, default=WINDOW_SIZE, help='розмір вікна (літери)')
+    parser.add_argument('--reference', default='freq_reference.json', help='референсні частоти літер')
+    parser.add_argument('--bigrams', default='top30_bigrams.json', help='референсні біграми для пошуку ключа')
+    parser.add_argument('--key', type=int, nargs=2, metavar=('A', 'B'), default=None, help='поточний ключ афінного шифру')
+    parser.add_argument('--track-key', action='store_true', help='визначати ключ за вікном і перевизначати після розбіжності')
+    parser.add_argument('--alpha', type=float, default=ALPHA, help='рівень значущості критерію хі-квадрат')
+    parser.add_argument('--threshold', type=float, default=DRIFT_THRESHOLD, help='поріг розбіжності хі-квадрат / N')
+    parser.add_argument('--top', type=int, default=5, help='кількість найчастіших n-грам у звіті')
+    parser.add_argument('--report-every', type=int, default=0, help='друкувати звіт кожні N літер (0 — не друкувати)')
+    args = parser.parse_args()
+    try:
+        main(args.input, args.window, args.reference, args.bigrams, tuple(args.key) if args.key else None,
+             args.track_key, args.alpha, args.threshold, args.top, args.report_every)
+    except BrokenPipeError:
+        pass
@@ -0,0 +1,162 @@
+import atexit
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+# Стан вимірювань: тривалість і пам'ять етапів, лічильники, профілювання одного етапу
+_settings = {
+    'memory': False,
+    'profile_stage': None,
+    'profile_output': None,
+}
+_stages = {}
+_order = []
+_counters = {}
+_stack = []
+# Один профілювальник на запуск: вмикається на час кожного виклику профільованого етапу
+_profile = {'profiler': None, 'depth': 0, 'calls': 0}
+
+def configure(memory=False, profile_stage=None, profile_output=None):
+    """
+    Налаштовує вимірювання: memory — відстежувати піковий обсяг пам'яті етапів
+    через tracemalloc, profile_stage — назва етапу, який виконується під cProfile,
+    profile_output — файл для статистики профілювальника (інакше вивід у консоль).
+    """
+    _settings['memory'] = memory
+    _settings['profile_stage'] = profile_stage
+    _settings['profile_output'] = profile_output
+    if profile_stage:
+        # Профіль записується один раз, після завершення всіх викликів етапу
+        atexit.unregister(write_profile)
+        atexit.register(write_profile)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def reset():
+    """
+    Очищає зібрані дані перед новим запуском.
+    """
+    _stages.clear()
+    _order.clear()
+    _counters.clear()
+    _stack.clear()
+    _profile.update(profiler=None, depth=0, calls=0)
+
+def add_arguments(parser):
+    """
+    Додає до argparse-парсера параметри --stats, --profile-stage та --profile-output.
+    """
+    parser.add_argument('--stats', metavar='FILE', nargs='?', const='-', default=None,
+                        help="зберегти звіт про етапи у JSON (без імені файлу — вивести в консоль)")
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None,
+                        help='виконати вказаний етап під cProfile')
+    parser.add_argument('--profile-output', metavar='FILE', default=None,
+                        help='файл для статистики cProfile (формат pstats)')
+
+def count(name, amount=1):
+    """
+    Збільшує лічильник name на amount.
+    """
+    _counters[name] = _counters.get(name, 0) + amount
+
+@contextlib.contextmanager
+def stage(name):
+    """
+    Вимірює етап: тривалість, кількість викликів та (за потреби) піковий приріст пам'яті.
+    Етапи можуть бути вкладеними; повторні виклики з тією ж назвою підсумовуються.
+    """
+    memory = _settings['memory'] and tracemalloc.is_tracing()
+    entry = {'start': 0, 'peak': 0, 'top': not _stack}
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            # Пік зовнішнього етапу зберігається до скидання лічильника tracemalloc
+            _stack[-1]['peak'] = max(_stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        entry['start'] = entry['peak'] = current
+    _stack.append(entry)
+    profiled = name == _settings['profile_stage']
+    started = time.perf_counter()
+    if profiled:
+        _enable_profile()
+    try:
+        yield
+    finally:
+        if profiled:
+            _disable_profile()
+        elapsed = time.perf_counter() - started
+        _stack.pop()
+        record = _stages.get(name)
+        if record is None:
+            record = _stages[name] = {'seconds': 0.0, 'calls': 0, 'top_level': entry['top']}
+            _order.append(name)
+        record['seconds'] += elapsed
+        record['calls'] += 1
+        if memory:
+            peak = max(entry['peak'], tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = max(record.get('peak_bytes', 0), peak - entry['start'])
+            if _stack:
+                _stack[-1]['peak'] = max(_stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+
+def _enable_profile():
+    # Вкладені виклики того самого етапу вже профілюються зовнішнім
+    if _profile['depth'] == 0:
+        if _profile['profiler'] is None:
+            _profile['profiler'] = cProfile.Profile()
+        _profile['profiler'].enable()
+    _profile['depth'] += 1
+    _profile['calls'] += 1
+
+def _disable_profile():
+    _profile['depth'] -= 1
+    if _profile['depth'] == 0:
+        _profile['profiler'].disable()
+
+def write_profile():
+    """
+    Записує сумарний профіль усіх викликів профільованого етапу у файл profile_output
+    або виводить його в консоль. Викликається один раз наприкінці запуску.
+    """
+    profiler = _profile['profiler']
+    if profiler is None:
+        return
+    _profile['profiler'] = None
+    name = _settings['profile_stage']
+    output = _settings['profile_output']
+    if output:
+        profiler.dump_stats(output)
+        print(f"Профіль етапу '{name}' ({_profile['calls']} викликів) збережено у файлі '{output}'.")
+        return
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(20)
+    print(f"Профіль етапу '{name}' ({_profile['calls']} викликів):")
+    print(stream.getvalue())
+
+def report():
+    """
+    Повертає звіт: етапи в порядку першого виконання та значення лічильників.
+    """
+    return {
+        'stages': [dict(name=name, **_stages[name]) for name in _order],
+        # Вкладені етапи вже враховані в тривалості зовнішніх
+        'total_seconds': sum(record['seconds'] for record in _stages.values() if record['top_level']),
+        'counters': dict(_counters),
+    }
+
+def write_report(filename):
+    """
+    Записує звіт у JSON файл або виводить його в консоль, якщо filename дорівнює '-'.
+    """
+    write_profile()
+    data = report()
+    if filename == '-':
+        print(json.dumps(data, ensure_ascii=False, indent=4))
+        return
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    print(f"Звіт про етапи збережено у файлі '{filename}'.")
@@ -0,0 +1,89 @@
+import mmap
+import struct
+import numpy as np
+
+from alphabet import get_alphabet
+
+# Файл бінарної референсної моделі мови
+MODEL_FILE = 'reference_model.bin'
+
+MAGIC = b'UKLM'
+MODEL_VERSION = 1
+
+# Заголовок: сигнатура, версія формату, розмір алфавіту, довжина алфавіту в байтах UTF-8
+HEADER = struct.Struct('<4sHHI')
+
+# Згладжування для n-грам, які не зустрілися в корпусі
+SMOOTHING = 0.5
+
+def log_probabilities(counts, smoothing=SMOOTHING):
+    """
+    Перетворює масив кількостей у логарифми ймовірностей зі згладжуванням.
+    """
+    counts = np.asarray(counts, dtype=np.float64) + smoothing
+    return np.log(counts / counts.sum())
+
+def _tables_offset(alphabet_bytes):
+    # Таблиці float32 вирівнюються на 4 байти від початку файлу
+    offset = HEADER.size + len(alphabet_bytes)
+    return offset + (-offset) % 4
+
+def save_model(filename, letter_counts, bigram_counts, trigram_counts, alphabet):
+    """
+    Записує модель: заголовок з версією та алфавітом, далі щільні таблиці
+    логарифмів ймовірностей float32 розміром m, m**2 та m**3.
+    """
+    m = len(alphabet)
+    alphabet_bytes = ''.join(alphabet).encode('utf-8')
+    offset = _tables_offset(alphabet_bytes)
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, MODEL_VERSION, m, len(alphabet_bytes)))
+        f.write(alphabet_bytes)
+        f.write(b'\0' * (offset - HEADER.size - len(alphabet_bytes)))
+        for counts, size in ((letter_counts, m), (bigram_counts, m ** 2), (trigram_counts, m ** 3)):
+            table = log_probabilities(np.asarray(counts).reshape(-1)).astype('<f4')
+            if len(table) != size:
+                raise ValueError(f"Очікувалось {size} значень, отримано {len(table)}.")
+            f.write(table.tobytes())
+    print(f"Модель мови збережено у файлі '{filename}'.")
+
+class LanguageModel:
+    """
+    Референсна модель мови, відображена в пам'ять. Таблиці letters, bigrams
+    та trigrams — масиви NumPy поверх mmap без копіювання.
+    """
+
+    def __init__(self, filename=MODEL_FILE):
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, m, alphabet_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Файл '{filename}' не є моделлю мови.")
+        if version != MODEL_VERSION:
+            raise ValueError(f"Непідтримувана версія моделі: {version}.")
+        alphabet_bytes = self._mmap[HEADER.size:HEADER.size + alphabet_length]
+        self.version = version
+        self.alphabet = get_alphabet(alphabet_bytes.decode('utf-8'))
+        if len(self.alphabet) != m:
+            raise ValueError(f"Пошкоджений алфавіт у файлі '{filename}'.")
+        offset = _tables_offset(alphabet_bytes)
+        tables = []
+        for size in (m, m ** 2, m ** 3):
+            tables.append(np.frombuffer(self._mmap, dtype='<f4', count=size, offset=offset))
+            offset += 4 * size
+        self.letters, self.bigrams, self.trigrams = tables
+
+    def close(self):
+        # Масиви поверх mmap стають недійсними після закриття
+        self.letters = self.bigrams = self.trigrams = None
+        self._mmap.close()
+
+def load_model(filename=MODEL_FILE):
+    """
+    Завантажує модель мови з файлу або повертає None, якщо файл не знайдено.
+    """
+    try:
+        return LanguageModel(filename)
+    except FileNotFoundError:
+        print(f"Файл '{filename}' не знайдено.")
+        return None
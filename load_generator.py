@@ -0,0 +1,109 @@
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+
+from crack_service import DEFAULT_HOST, DEFAULT_PORT
+from affine_tables import translate_encrypt, valid_keys
+
+def percentile(values, fraction):
+    """
+    Перцентиль відсортованого списку (метод найближчого рангу).
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+def make_payloads(endpoint, count, length, seed=0, source='text1.txt'):
+    """
+    Готує тіла запитів: фрагменти вихідного тексту довжиною length, зашифровані
+    випадковими ключами (для /crack та /decrypt) або відкриті (для /encrypt та /frequency).
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        text = f.read()
+    rng = random.Random(seed)
+    keys = valid_keys()
+    payloads = []
+    for _ in range(count):
+        start = rng.randrange(max(1, len(text) - length))
+        fragment = text[start:start + length]
+        a, b = rng.choice(keys)
+        if endpoint in ('/crack', '/decrypt'):
+            fragment = translate_encrypt(fragment, a, b)
+        payloads.append(json.dumps({'text': fragment, 'a': a, 'b': b}, ensure_ascii=False).encode('utf-8'))
+    return payloads
+
+async def _client(host, port, unix_path, endpoint, payloads, latencies, errors):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in payloads:
+            started = time.perf_counter()
+            writer.write((f"POST {endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load(endpoint='/crack', requests=1000, concurrency=32, length=300,
+                   host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    """
+    Надсилає requests запитів через concurrency постійних з'єднань і повертає
+    пропускну здатність та затримки (с).
+    """
+    payloads = make_payloads(endpoint, requests, length)
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, unix_path, endpoint, payloads[i::concurrency], latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'endpoint': endpoint,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': elapsed,
+        'requests_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Генератор навантаження для локального сервісу зламу.')
+    parser.add_argument('--endpoint', default='/crack',
+                        choices=['/crack', '/encrypt', '/decrypt', '/frequency'], help='кінцева точка')
+    parser.add_argument('--requests', type=int, default=1000, help='загальна кількість запитів')
+    parser.add_argument('--concurrency', type=int, default=32, help="кількість одночасних з'єднань")
+    parser.add_argument('--length', type=int, default=300, help='довжина тексту в запиті (символи)')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='адреса сервісу')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='порт сервісу')
+    parser.add_argument('--unix', default=None, help='шлях до Unix-сокета сервісу')
+    args = parser.parse_args()
+    result = asyncio.run(run_load(args.endpoint, args.requests, args.concurrency, args.length,
+                                  args.host, args.port, args.unix))
+    print(f"{result['requests']} запитів до {result['endpoint']} за {result['seconds']:.2f} с: "
+          f"{result['requests_per_sec']:.1f} запитів/с, p50 = {result['p50'] * 1000:.1f} мс, "
+          f"p99 = {result['p99'] * 1000:.1f} мс, помилок: {result['errors']}.")
+    sys.exit(1 if result['errors'] else 0)
@@ -1,21 +1,17 @@
+import argparse
 import random
 from collections import Counter
-import re
-import matplotlib.pyplot as plt
 import json
+import plotting
+import os
+import numpy as np
+from alphabet import UKRAINIAN
+from language_model import MODEL_FILE, load_model
+from substitution_solver import REFERENCE_CORPUS, build_reference_tables, solve, parallel_solve
+from word_matcher import word_matcher
 
 # Український алфавіт
-LOWER_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
-
-UPPER_ALPHABET = [char.upper() for char in LOWER_ALPHABET]
-
-ALPHABET = LOWER_ALPHABET + UPPER_ALPHABET
-ALPHABET_SET = set(ALPHABET)
+LOWER_ALPHABET = UKRAINIAN
 m = len(LOWER_ALPHABET)  # Розмір алфавіту (33)
 
 def clean_text(text):
@@ -23,19 +19,18 @@ def clean_text(text):
     Очищає текст: видаляє всі символи, крім літер українського алфавіту,
     пробілів та переносів рядків.
     """
-    allowed_chars = ALPHABET_SET.union({' ', '\n'})
-    cleaned = ''.join(char for char in text if char in allowed_chars)
-    return cleaned
+    return LOWER_ALPHABET.clean(text, keep=' \n', lower=False)
 
 def generate_substitution_cipher():
     """
     Генерує випадкову моноалфавітну підстановку (таблицю відповідностей).
     """
-    shuffled_lower = LOWER_ALPHABET.copy()
+    shuffled_lower = list(LOWER_ALPHABET)
     random.shuffle(shuffled_lower)
     substitution_map = {original: shuffled for original, shuffled in zip(LOWER_ALPHABET, shuffled_lower)}
     # Створюємо також карту для великих літер
-    substitution_map.update({original.upper(): shuffled.upper() for original, shuffled in zip(LOWER_ALPHABET, shuffled_lower)})
+    to_upper = LOWER_ALPHABET.to_upper
+    substitution_map.update({to_upper[original]: to_upper[shuffled] for original, shuffled in zip(LOWER_ALPHABET, shuffled_lower)})
     return substitution_map
 
 def encrypt_substitution(plain, substitution_map):
@@ -76,6 +71,10 @@ def plot_frequency_graph(frequencies, title='Частоти літер'):
     """
     Побудова графіку частот літер у тексті.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+
     letters = list(frequencies.keys())
     freqs = list(frequencies.values())
 
@@ -88,7 +87,7 @@ def plot_frequency_graph(frequencies, title='Частоти літер'):
     plt.ylabel('Частота')
     plt.title(title)
     plt.grid(axis='y', alpha=0.75)
-    plt.show()
+    plotting.show('plot_frequency_graph')
 
 def find_possible_mappings(cipher_freq_letters, language_freq_letters):
     """
@@ -113,15 +112,15 @@ def apply_mapping(cipher, mapping):
 
 def contains_known_words(text, word_list):
     """
-    Перевіряє, чи містить текст відомі слова з word_list.
+    Перевіряє, чи містить текст відомі слова з word_list (список або WordMatcher).
     """
-    words = re.findall(r'\b\w+\b', text.lower())
-    for word in words:
-        if word in word_list:
-            return True
-    return False
+    return word_matcher(word_list).contains(text)
 
-def main():
+def main(workers=None, restarts=5, target_score=None):
+    """
+    Шифрує текст випадковою підстановкою та виконує криптоаналіз шифротексту.
+    Якщо задано workers, перезапуски Hill-Climbing виконуються паралельно в пулі процесів.
+    """
     # Крок 1: Генерація випадкової підстановки та шифрування тексту
     substitution_map = generate_substitution_cipher()
 
@@ -178,12 +177,58 @@ def main():
     print(decrypted_partial)
     print('-' * 50)
 
-    # Додатковий крок: Пошук повної відповідності
-    # Для цього потрібно використовувати більш складні методи, наприклад, перевірку наявності відомих слів,
-    # або використовувати алгоритми оптимізації (Hill-Climbing, Genetic Algorithms тощо).
-    # Тут ми обмежимося початковим частковим дешифруванням.
+    # Крок 3: Пошук повної відповідності методом Hill-Climbing
+    # Оцінка оновлюється інкрементно за матрицями біграм і триграм шифротексту
+    model = load_model(MODEL_FILE) if os.path.exists(MODEL_FILE) else None
+    if model is not None:
+        # Повні таблиці біграм і триграм з бінарної моделі мови
+        bigram_logp = np.asarray(model.bigrams, dtype=np.float64)
+        trigram_logp = np.asarray(model.trigrams, dtype=np.float64)
+        model.close()
+    else:
+        try:
+            with open(REFERENCE_CORPUS, 'r', encoding='utf-8') as f:
+                corpus_text = f.read()
+        except FileNotFoundError:
+            print(f"Файл {REFERENCE_CORPUS} не знайдено. Повний пошук ключа пропущено.")
+            return
+        bigram_logp, trigram_logp = build_reference_tables(corpus_text)
+    try:
+        with open('freq_reference.json', 'r', encoding='utf-8') as f:
+            reference_freq = json.load(f)
+    except FileNotFoundError:
+        reference_freq = {}
+
+    if workers:
+        result = parallel_solve(cipher_text, bigram_logp, trigram_logp, reference_freq,
+                                restarts=restarts, workers=workers, target_score=target_score)
+        print(f"Виконано {result['restarts']} перезапусків у {workers} процесах.")
+    else:
+        result = solve(cipher_text, bigram_logp, trigram_logp, reference_freq, restarts=restarts)
+    print(f"Hill-Climbing: {result['iterations']} ітерацій за {result['elapsed']:.2f} с "
+          f"({result['iterations_per_second']:.0f} ітерацій/с), оцінка = {result['score']:.2f}")
+
+    lower_mapping = {c: p for c, p in result['mapping'].items() if c in LOWER_ALPHABET}
+    print(f"Знайдена підстановка: {lower_mapping}")
 
-    # Варіант автоматичного розширення відповідностей може бути доданий за необхідності
+    # Порівняння зі справжньою підстановкою для літер, що є у шифротексті
+    reverse_map = {v: k for k, v in substitution_map.items()}
+    present = {char for char in cleaned_cipher.lower() if char in LOWER_ALPHABET}
+    correct = sum(1 for char in present if lower_mapping[char] == reverse_map[char])
+    print(f"Правильно відновлено {correct} з {len(present)} літер шифротексту.")
+
+    print("\nРезультат дешифрування з повною підстановкою:")
+    print(apply_mapping(cipher_text, result['mapping']))
+    print('-' * 50)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Шифр підстановки та його криптоаналіз.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='кількість процесів для паралельних перезапусків')
+    parser.add_argument('--restarts', type=int, default=5, help='кількість перезапусків Hill-Climbing')
+    parser.add_argument('--target-score', type=float, default=None,
+                        help='зупинити пошук, щойно оцінка досягне цього значення')
+    plotting.add_arguments(parser)
+    args = parser.parse_args()
+    plotting.configure(args.headless, args.save_figures)
+    main(workers=args.workers, restarts=args.restarts, target_score=args.target_score)
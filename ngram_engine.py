@@ -0,0 +1,172 @@
+from collections import Counter
+from collections.abc import Mapping
+import numpy as np
+
+from affine_tables import LOWER_ALPHABET
+from alphabet import get_alphabet
+
+# Найбільший розмір щільного масиву частот (33**4); для більших просторів n-грам
+# використовується розріджене представлення
+DENSE_LIMIT = len(LOWER_ALPHABET) ** 4
+
+def code_points(text):
+    """
+    Повертає масив кодів Unicode символів тексту.
+    """
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+def encode_letters(text, alphabet=LOWER_ALPHABET, ignore_case=True):
+    """
+    Кодує текст як масив індексів літер 0..m-1, відкидаючи всі інші символи.
+    """
+    table = get_alphabet(alphabet).code_table(ignore_case)
+    points = code_points(text)
+    points = points[points < len(table)]
+    indices = table[points]
+    return indices[indices >= 0].astype(np.uint8)
+
+def ngram_codes(codes, n, m):
+    """
+    Перетворює послідовність індексів літер у коди n-грам у системі числення з основою m.
+    """
+    if len(codes) < n:
+        return np.zeros(0, dtype=np.int64)
+    result = codes[:len(codes) - n + 1].astype(np.int64)
+    for offset in range(1, n):
+        result = result * m + codes[offset:len(codes) - n + 1 + offset]
+    return result
+
+def first_occurrence(codes, size):
+    """
+    Масив довжини size: позиція першої появи кожного коду в codes (або len(codes), якщо код не зустрічається).
+    """
+    first = np.full(size, len(codes), dtype=np.int64)
+    # При повторних індексах присвоюється останнє значення, тому йдемо з кінця
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1, dtype=np.int64)
+    return first
+
+def ngram_array(codes, n, m):
+    """
+    Щільний масив частот n-грам довжини m**n (індекс — код n-грами).
+    """
+    return np.bincount(ngram_codes(codes, n, m), minlength=m ** n).astype(np.int64)
+
+class NgramCounts(Mapping):
+    """
+    Сумісне з Counter подання частот n-грам, що зберігає лише цілочисельні коди
+    та кількості. Рядки n-грам створюються лише при зверненні до ключів.
+    Якщо відомі позиції першої появи (first), порядок ітерації та порядок рівних
+    у most_common збігаються з Counter, побудованим по тексту.
+    """
+
+    def __init__(self, codes, counts, symbols, n, array=None, first=None):
+        self.codes = codes
+        self.counts = counts
+        # Порядок ітерації: за першою появою в тексті або за кодом
+        self.order = np.argsort(first, kind='stable') if first is not None else np.arange(len(codes))
+        self.symbols = list(symbols)
+        self.n = n
+        self.base = len(self.symbols)
+        # Щільний масив частот (якщо простір n-грам не завеликий)
+        self.array = array
+        self._index = {char: i for i, char in enumerate(self.symbols)}
+
+    @classmethod
+    def from_array(cls, array, symbols, n, first=None):
+        """
+        Створює подання зі щільного масиву частот довжини len(symbols)**n
+        (first — необов'язковий щільний масив позицій першої появи).
+        """
+        codes = np.flatnonzero(array)
+        return cls(codes, array[codes], symbols, n, array, None if first is None else first[codes])
+
+    def _decode(self, code):
+        chars = []
+        for _ in range(self.n):
+            code, index = divmod(code, self.base)
+            chars.append(self.symbols[index])
+        return ''.join(reversed(chars))
+
+    def _encode(self, ngram):
+        if not isinstance(ngram, str) or len(ngram) != self.n:
+            return None
+        code = 0
+        for char in ngram:
+            index = self._index.get(char)
+            if index is None:
+                return None
+            code = code * self.base + index
+        return code
+
+    def _position(self, ngram):
+        code = self._encode(ngram)
+        if code is None:
+            return None
+        position = int(np.searchsorted(self.codes, code))
+        if position < len(self.codes) and self.codes[position] == code:
+            return position
+        return None
+
+    def __getitem__(self, ngram):
+        # Як і Counter, повертає 0 для відсутніх n-грам
+        position = self._position(ngram)
+        return 0 if position is None else int(self.counts[position])
+
+    def __contains__(self, ngram):
+        return self._position(ngram) is not None
+
+    def get(self, ngram, default=None):
+        position = self._position(ngram)
+        return default if position is None else int(self.counts[position])
+
+    def __iter__(self):
+        for code in self.codes[self.order].tolist():
+            yield self._decode(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def items(self):
+        return list(zip(self, self.counts[self.order].tolist()))
+
+    def values(self):
+        return self.counts[self.order].tolist()
+
+    def total(self):
+        return int(self.counts.sum())
+
+    def most_common(self, n=None):
+        """
+        Повертає n найчастіших n-грам; n-грами з рівною кількістю йдуть у порядку ітерації.
+        """
+        rank = np.empty(len(self.order), dtype=np.int64)
+        rank[self.order] = np.arange(len(self.order))
+        order = np.lexsort((rank, -self.counts))
+        if n is not None:
+            order = order[:n]
+        return [(self._decode(code), count) for code, count in zip(self.codes[order].tolist(), self.counts[order].tolist())]
+
+    def to_counter(self):
+        return Counter(dict(self.items()))
+
+def count_ngrams(text, n, alphabet=LOWER_ALPHABET):
+    """
+    Підраховує кількість n-грам в тексті. Якщо текст складається лише з малих літер алфавіту,
+    кожна n-грама кодується числом з основою m і підраховується через np.bincount;
+    інакше алфавіт кодування будується з символів самого тексту.
+    """
+    alphabet = get_alphabet(alphabet)
+    points = code_points(text)
+    table = alphabet.code_table(False)
+    indices = table[np.minimum(points, len(table) - 1)] if len(points) else points.astype(np.int16)
+    if len(points) == 0 or (np.all(points < len(table)) and np.all(indices >= 0)):
+        symbols = list(alphabet)
+    else:
+        unique, indices = np.unique(points, return_inverse=True)
+        symbols = [chr(point) for point in unique.tolist()]
+    codes = ngram_codes(indices, n, len(symbols))
+    if len(symbols) ** n <= DENSE_LIMIT:
+        array = np.bincount(codes, minlength=len(symbols) ** n).astype(np.int64)
+        return NgramCounts.from_array(array, symbols, n, first_occurrence(codes, len(array)))
+    unique_codes, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    return NgramCounts(unique_codes, counts.astype(np.int64), symbols, n, first=first)
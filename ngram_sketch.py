@@ -0,0 +1,333 @@
+import argparse
+import json
+import math
+import numpy as np
+
+from corpus_stream import UKRAINIAN_ALPHABET, CHUNK_SIZE, iter_ngram_codes
+from sizes import parse_size, format_size
+
+# Найдовші n-грами, коди яких (з основою 33) ще вміщуються в int64
+MAX_ORDER = 12
+
+# Кількість рядків Count-Min: імовірність перевищити межу похибки — e^-DEPTH
+DEPTH = 5
+
+# Байти на один лічильник Space-Saving (код і кількість) та одну клітинку Count-Min
+COUNTER_BYTES = 16
+CELL_BYTES = 8
+
+DEFAULT_MEMORY = '8MB'
+
+# Частка бюджету пам'яті, що віддається Count-Min (решта — Space-Saving)
+COUNT_MIN_SHARE = 0.5
+
+class CountMinSketch:
+    """
+    Count-Min: таблиця depth x width лічильників з незалежними хеш-функціями для кожного рядка.
+    Оцінка кількості не менша за справжню і з імовірністю 1 - e^-depth перевищує її
+    не більше ніж на e / width * N. Ескізи з однаковими width, depth і seed зливаються додаванням.
+    """
+
+    def __init__(self, width, depth=DEPTH, seed=0):
+        # Ширина округлюється до степеня двійки: хеш — старші біти добутку (multiply-shift)
+        self.bits = max(1, int(width).bit_length() - 1)
+        self.width = 1 << self.bits
+        self.depth = depth
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(1, 2 ** 63, depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, depth, dtype=np.uint64)
+        self.table = np.zeros((depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _row_indices(self, row, codes):
+        hashed = codes.astype(np.uint64) * self.multipliers[row] + self.offsets[row]
+        return (hashed >> np.uint64(64 - self.bits)).astype(np.intp)
+
+    def add(self, codes, counts):
+        """
+        Додає кількості counts для кодів codes (коди можуть повторюватися).
+        """
+        for row in range(self.depth):
+            indices = self._row_indices(row, codes)
+            self.table[row] += np.bincount(indices, weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(np.sum(counts))
+
+    def estimate(self, codes):
+        """
+        Оцінки кількостей (верхні межі) для масиву кодів.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        result = np.full(len(codes), np.iinfo(np.int64).max, dtype=np.int64)
+        for row in range(self.depth):
+            np.minimum(result, self.table[row, self._row_indices(row, codes)], out=result)
+        return result
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def error_bound(self):
+        """
+        Межа надлишку оцінки (у кількостях), що виконується з імовірністю 1 - delta.
+        """
+        return self.epsilon * self.total
+
+    def merge(self, other):
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("Зливати можна лише ескізи Count-Min з однаковими width, depth і seed.")
+        self.table += other.table
+        self.total += other.total
+
+class SpaceSaving:
+    """
+    Space-Saving на capacity лічильників, збережений у рівносильній формі Місри–Гріса:
+    count — нижня межа справжньої кількості, count + error — верхня (саме її повертає
+    класичний Space-Saving), а будь-яка n-грама поза лічильниками зустрілася не більше error разів.
+    error <= N / (capacity + 1). Підсумки зливаються зі збереженням цієї межі для суми потоків.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("Space-Saving потребує хоча б одного лічильника.")
+        self.capacity = capacity
+        self.codes = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.error = 0
+        self.total = 0
+
+    def add(self, codes, counts):
+        """
+        Додає кількості counts для різних кодів codes (наприклад, точні частоти частини корпусу).
+        """
+        self._combine(codes, counts, int(np.sum(counts)), 0)
+
+    def merge(self, other):
+        self._combine(other.codes, other.counts, other.total, other.error)
+
+    def _combine(self, codes, counts, total, error):
+        codes, inverse = np.unique(np.concatenate((self.codes, codes)), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate((self.counts, counts))).astype(np.int64)
+        self.error += error
+        self.total += total
+        if len(codes) > self.capacity:
+            # Усі лічильники зменшуються на (capacity + 1)-шу найбільшу кількість;
+            # кожне таке зменшення «оплачене» capacity + 1 різними входженнями потоку
+            threshold = int(np.partition(counts, len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1])
+            counts = counts - threshold
+            keep = counts > 0
+            codes, counts = codes[keep], counts[keep]
+            self.error += threshold
+        self.codes, self.counts = codes, counts
+
+    def bounds(self, codes):
+        """
+        Нижні та верхні межі кількостей для масиву кодів.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        position = np.minimum(np.searchsorted(self.codes, codes), max(len(self.codes) - 1, 0))
+        found = (self.codes[position] == codes) if len(self.codes) else np.zeros(len(codes), dtype=bool)
+        lower = np.where(found, self.counts[position] if len(self.codes) else 0, 0)
+        return lower, lower + self.error
+
+    def top(self, k):
+        """
+        Коди та нижні межі k найбільших лічильників (рівні — за зростанням коду).
+        """
+        order = np.lexsort((self.codes, -self.counts))[:k]
+        return self.codes[order], self.counts[order]
+
+class NgramSketch:
+    """
+    Наближені частоти n-грам у межах заданого бюджету пам'яті: Space-Saving знаходить
+    найчастіші n-грами, а Count-Min звужує верхні межі їхніх кількостей і оцінює будь-яку іншу n-граму.
+    """
+
+    def __init__(self, n, memory=DEFAULT_MEMORY, seed=0):
+        if not 1 <= n <= MAX_ORDER:
+            raise ValueError(f"Довжина n-грам має бути від 1 до {MAX_ORDER}.")
+        if isinstance(memory, str):
+            memory = parse_size(memory)
+        self.n = n
+        self.memory = memory
+        self.alphabet = UKRAINIAN_ALPHABET
+        cells = int(memory * COUNT_MIN_SHARE) // (CELL_BYTES * DEPTH)
+        self.count_min = CountMinSketch(max(cells, 2), DEPTH, seed)
+        self.space_saving = SpaceSaving(max(1, int(memory * (1 - COUNT_MIN_SHARE)) // COUNTER_BYTES))
+
+    @property
+    def total(self):
+        return self.space_saving.total
+
+    def update(self, grams):
+        """
+        Додає масив кодів n-грам (частину потоку).
+        """
+        if not len(grams):
+            return
+        codes, counts = np.unique(grams, return_counts=True)
+        self.space_saving.add(codes, counts)
+        self.count_min.add(codes, counts)
+
+    def _encode(self, ngram):
+        if len(ngram) != self.n:
+            raise ValueError(f"Очікувалася n-грама довжини {self.n}: '{ngram}'.")
+        code = 0
+        for char in ngram:
+            index = self.alphabet.index.get(char)
+            if index is None:
+                raise ValueError(f"Символ '{char}' n-грами '{ngram}' не належить алфавіту.")
+            code = code * self.alphabet.m + index
+        return code
+
+    def _decode(self, code):
+        chars = []
+        for _ in range(self.n):
+            code, index = divmod(code, self.alphabet.m)
+            chars.append(self.alphabet[index])
+        return ''.join(reversed(chars))
+
+    def bounds(self, codes):
+        """
+        Нижні та верхні межі кількостей: верхня — менша з меж Space-Saving і Count-Min
+        (остання виконується з імовірністю 1 - delta).
+        """
+        lower, upper = self.space_saving.bounds(codes)
+        return lower, np.maximum(lower, np.minimum(upper, self.count_min.estimate(codes)))
+
+    def estimate(self, ngram):
+        """
+        Оцінка кількості n-грами (верхня межа).
+        """
+        return int(self.bounds([self._encode(ngram)])[1][0])
+
+    def top(self, k=30):
+        """
+        k найчастіших n-грам: список (n-грама, нижня межа, верхня межа).
+        Відбір іде за верхньою межею; n-грама з верхньою межею вище за error Space-Saving
+        гарантовано зберігається в лічильниках.
+        """
+        codes = self.space_saving.codes
+        lower, upper = self.bounds(codes)
+        order = np.lexsort((codes, -lower, -upper))[:k]
+        return [(self._decode(code), low, high)
+                for code, low, high in zip(codes[order].tolist(), lower[order].tolist(), upper[order].tolist())]
+
+    def most_common(self, k=30):
+        """
+        Як Counter.most_common: k найчастіших n-грам з оцінками кількостей.
+        """
+        return [(ngram, high) for ngram, _, high in self.top(k)]
+
+    def error_bounds(self):
+        """
+        Гарантії точності: найбільший надлишок оцінки Space-Saving (точно),
+        межа Count-Min з імовірністю 1 - delta, розмір потоку та фактична пам'ять.
+        """
+        return {
+            'n': self.n,
+            'total': self.total,
+            'space_saving': self.space_saving.error,
+            'space_saving_limit': self.total / (self.space_saving.capacity + 1),
+            'count_min': self.count_min.error_bound(),
+            'delta': self.count_min.delta,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+    def memory_bytes(self):
+        return self.count_min.table.nbytes + self.space_saving.codes.nbytes + self.space_saving.counts.nbytes
+
+    def merge(self, other):
+        """
+        Зливає ескіз, побудований на іншій частині корпусу (можливо, на іншій машині).
+        """
+        if self.n != other.n:
+            raise ValueError("Зливати можна лише ескізи n-грам однакової довжини.")
+        self.count_min.merge(other.count_min)
+        self.space_saving.merge(other.space_saving)
+
+    def save(self, filename):
+        """
+        Зберігає ескіз у файл .npz.
+        """
+        np.savez(filename, n=self.n, memory=self.memory, seed=self.count_min.seed,
+                 capacity=self.space_saving.capacity, error=self.space_saving.error,
+                 total=self.total, count_min_total=self.count_min.total,
+                 codes=self.space_saving.codes, counts=self.space_saving.counts, table=self.count_min.table)
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as data:
+            sketch = cls(int(data['n']), int(data['memory']), int(data['seed']))
+            sketch.space_saving.capacity = int(data['capacity'])
+            sketch.space_saving.error = int(data['error'])
+            sketch.space_saving.total = int(data['total'])
+            sketch.space_saving.codes = data['codes']
+            sketch.space_saving.counts = data['counts']
+            if data['table'].shape != sketch.count_min.table.shape:
+                raise ValueError(f"Ескіз '{filename}' пошкоджено: розмір таблиці Count-Min не відповідає бюджету.")
+            sketch.count_min.table = data['table']
+            sketch.count_min.total = int(data['count_min_total'])
+        return sketch
+
+def build_sketch(file_paths, n, memory=DEFAULT_MEMORY, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Будує ескіз n-грам для файлів корпусу потоково. Крім бюджету ескізу, пам'ять
+    потрібна лише на одну частину файлу (chunk_size символів).
+    """
+    sketch = NgramSketch(n, memory, seed)
+    for file_path in file_paths:
+        for grams in iter_ngram_codes(file_path, n, chunk_size):
+            sketch.update(grams)
+    return sketch
+
+def print_top(sketch, top_n=30):
+    """
+    Виводить топ-N n-грам з відносними частотами та межами похибки.
+    """
+    total = sketch.total or 1
+    bounds = sketch.error_bounds()
+    print(f"\nТоп {top_n} {sketch.n}-грам (наближено, {bounds['total']} n-грам, "
+          f"пам'ять {format_size(bounds['memory_bytes'])}):")
+    for ngram, low, high in sketch.top(top_n):
+        print(f"{ngram}: {high / total:.4f} (не менше {low / total:.4f})")
+    print(f"Space-Saving: надлишок не більше {bounds['space_saving'] / total:.6f} "
+          f"(гарантовано <= {bounds['space_saving_limit'] / total:.6f}); "
+          f"Count-Min: не більше {bounds['count_min'] / total:.6f} з імовірністю {1 - bounds['delta']:.4f}.")
+
+def main(file_paths, n, memory=DEFAULT_MEMORY, merge_files=(), save_file=None, json_file=None, top_n=30, seed=0):
+    """
+    Будує ескіз для файлів корпусу, зливає його з готовими ескізами, виводить топ-N
+    та за потреби зберігає ескіз і топ-N (кількості — верхні межі) у JSON.
+    """
+    sketch = build_sketch(file_paths, n, memory, seed)
+    for filename in merge_files:
+        sketch.merge(NgramSketch.load(filename))
+    print_top(sketch, top_n)
+    if save_file:
+        sketch.save(save_file)
+        print(f"Ескіз збережено у файлі '{save_file}'.")
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(dict(sketch.most_common(top_n)), f, ensure_ascii=False, indent=4)
+        print(f"Частоти збережено у файлі '{json_file}'.")
+    return sketch
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Наближені частоти довгих n-грам в обмеженій пам'яті (Space-Saving і Count-Min).")
+    parser.add_argument('files', nargs='*', metavar='file', help='файли корпусу')
+    parser.add_argument('-n', type=int, default=5, help=f'довжина n-грам (1..{MAX_ORDER})')
+    parser.add_argument('--memory', default=DEFAULT_MEMORY, help="бюджет пам'яті ескізу (наприклад, 8MB)")
+    parser.add_argument('--merge', nargs='+', default=[], metavar='SKETCH', help='злити з ескізами з файлів .npz')
+    parser.add_argument('--save', default=None, help='зберегти ескіз у файл .npz')
+    parser.add_argument('--json', default=None, help='зберегти топ-N у JSON')
+    parser.add_argument('--top', type=int, default=30, help='кількість найчастіших n-грам')
+    parser.add_argument('--seed', type=int, default=0, help='зерно хеш-функцій (однакове для ескізів, що зливаються)')
+    args = parser.parse_args()
+    if not args.files and not args.merge:
+        parser.error('потрібні файли корпусу або ескізи для злиття')
+    main(args.files, args.n, args.memory, args.merge, args.save, args.json, args.top, args.seed)
@@ -0,0 +1,111 @@
+import math
+import numpy as np
+
+import plotting
+from affine_tables import LOWER_ALPHABET
+from alphabet import get_alphabet
+from ngram_engine import encode_letters, ngram_array
+
+def ngram_tensor(counts, n, alphabet=LOWER_ALPHABET):
+    """
+    Щільний тензор частот n-грам форми (m,) * n: element [x1, ..., xn] — кількість n-грами x1...xn.
+    counts — щільний масив довжини m**n (як у stream_ngram_array) або NgramCounts з таким масивом.
+    """
+    m = len(alphabet)
+    array = getattr(counts, 'array', counts)
+    if array is None:
+        raise ValueError("Для тензора потрібен щільний масив частот.")
+    array = np.asarray(array)
+    if array.size != m ** n:
+        raise ValueError(f"Очікувався масив довжини {m ** n}, отримано {array.size}.")
+    return array.reshape((m,) * n)
+
+def tensor_from_text(text, n, alphabet=LOWER_ALPHABET):
+    """
+    Тензор частот n-грам тексту (літери поза алфавітом відкидаються).
+    """
+    m = len(alphabet)
+    return ngram_array(encode_letters(text, alphabet), n, m).reshape((m,) * n)
+
+def tensor_from_mapping(freq_dict, n, alphabet=LOWER_ALPHABET):
+    """
+    Тензор зі словника n-грама -> значення (наприклад, топ-30 з JSON). Усі n-грами
+    кодуються одним викликом; n-грами з символами поза алфавітом пропускаються.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    grams = [gram for gram in freq_dict if len(gram) == n and all(char in alphabet.index for char in gram)]
+    tensor = np.zeros(m ** n)
+    if grams:
+        indices = alphabet.code_table(False)[np.frombuffer(''.join(grams).encode('utf-32-le'), dtype=np.uint32)]
+        codes = (indices.reshape(-1, n).astype(np.int64) * (m ** np.arange(n - 1, -1, -1))).sum(axis=1)
+        np.add.at(tensor, codes, np.array([freq_dict[gram] for gram in grams], dtype=np.float64))
+    return tensor.reshape((m,) * n)
+
+def normalize(tensor):
+    """
+    Відносні частоти: тензор, поділений на суму всіх елементів.
+    """
+    total = tensor.sum()
+    return tensor / total if total else np.zeros(tensor.shape)
+
+def marginal(tensor, axes):
+    """
+    Маргінальний розподіл за осями axes (наприклад, (0, 1) для перших двох літер триграми).
+    """
+    axes = (axes,) if isinstance(axes, int) else tuple(axes)
+    other = tuple(axis for axis in range(tensor.ndim) if axis not in axes)
+    return normalize(tensor.sum(axis=other))
+
+def conditional(tensor, given=None):
+    """
+    Умовні ймовірності P(решта літер | літери на осях given). За замовчуванням given —
+    усі осі, крім останньої, тобто P(остання літера | попередні). Для невідомих префіксів — нулі.
+    """
+    given = tuple(range(tensor.ndim - 1)) if given is None else ((given,) if isinstance(given, int) else tuple(given))
+    other = tuple(axis for axis in range(tensor.ndim) if axis not in given)
+    totals = tensor.sum(axis=other, keepdims=True)
+    return np.divide(tensor, totals, out=np.zeros(tensor.shape), where=totals > 0)
+
+def plot_heatmap(matrix, title, name, xlabel, ylabel, cmap='Blues', alphabet=LOWER_ALPHABET):
+    """
+    Теплова карта матриці m x m з літерами на осях.
+    """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
+    letters = list(alphabet)
+    plt.figure(figsize=(12, 10))
+    sns.heatmap(matrix, annot=False, cmap=cmap, xticklabels=letters, yticklabels=letters)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.tight_layout()
+    plotting.show(name)
+
+def plot_slices(tensor, title, name, cmap='Greens', alphabet=LOWER_ALPHABET, columns=6):
+    """
+    Панелі m x m для кожної першої літери триграми: tensor[x] по осях (друга, третя літера).
+    Порожні панелі (літера не зустрічається першою) пропускаються.
+    """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+
+    letters = list(alphabet)
+    present = np.flatnonzero(tensor.reshape(len(letters), -1).any(axis=1))
+    rows = max(1, math.ceil(len(present) / columns))
+    fig, axes = plt.subplots(rows, columns, figsize=(3 * columns, 3 * rows), squeeze=False)
+    for ax in axes.flat[len(present):]:
+        ax.axis('off')
+    for ax, first in zip(axes.flat, present.tolist()):
+        # imshow замість sns.heatmap: десятки панелей малюються в рази швидше
+        ax.imshow(tensor[first], cmap=cmap, interpolation='nearest')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_title(f"{letters[first]}··")
+    fig.suptitle(title)
+    plt.tight_layout()
+    plotting.show(name)
@@ -0,0 +1,69 @@
+import os
+
+# Змінні середовища для запуску без вікон (пакетні завдання)
+HEADLESS_ENV = 'ZIKS_HEADLESS'
+FIGURES_DIR_ENV = 'ZIKS_FIGURES_DIR'
+
+_settings = {
+    'headless': os.environ.get(HEADLESS_ENV, '') not in ('', '0'),
+    'figures_dir': os.environ.get(FIGURES_DIR_ENV) or None,
+    'saved': 0,
+}
+
+def configure(headless=False, figures_dir=None):
+    """
+    Налаштовує виведення графіків: headless — не будувати графіки взагалі,
+    figures_dir — зберігати графіки у файли без відкриття вікон.
+    """
+    if headless:
+        _settings['headless'] = True
+    if figures_dir:
+        _settings['figures_dir'] = figures_dir
+
+def add_arguments(parser):
+    """
+    Додає до argparse-парсера параметри --headless та --save-figures.
+    """
+    parser.add_argument('--headless', action='store_true', help='не будувати графіки')
+    parser.add_argument('--save-figures', metavar='DIR', default=None,
+                        help='зберігати графіки у каталог замість показу у вікні')
+
+def enabled():
+    """
+    Чи потрібно будувати графіки.
+    """
+    return not _settings['headless'] or _settings['figures_dir'] is not None
+
+def pyplot():
+    """
+    Імпортує matplotlib.pyplot лише при першій потребі. При збереженні у файли
+    використовується неінтерактивний бекенд Agg.
+    """
+    import matplotlib
+    if _settings['figures_dir'] is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def seaborn():
+    """
+    Імпортує seaborn лише при першій потребі.
+    """
+    import seaborn as sns
+    return sns
+
+def show(name):
+    """
+    Показує поточний графік або зберігає його у файл <номер>_<name>.png.
+    """
+    plt = pyplot()
+    figures_dir = _settings['figures_dir']
+    if figures_dir is None:
+        plt.show()
+        return
+    os.makedirs(figures_dir, exist_ok=True)
+    _settings['saved'] += 1
+    filename = os.path.join(figures_dir, f"{_settings['saved']:02d}_{name}.png")
+    plt.savefig(filename)
+    plt.close()
+    print(f"Графік збережено у файлі '{filename}'.")
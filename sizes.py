@@ -0,0 +1,21 @@
+# Одиниці розміру в байтах
+UNITS = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'B': 1}
+
+def parse_size(text):
+    """
+    Перетворює розмір на зразок '10KB' або '1GB' у кількість байтів.
+    """
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+def format_size(size):
+    """
+    Подає кількість байтів у вигляді '10KB', '1MB' тощо.
+    """
+    for unit in ('GB', 'MB', 'KB'):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return f"{size}B"
@@ -0,0 +1,261 @@
+import math
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+
+from affine_tables import LOWER_ALPHABET
+from alphabet import get_alphabet
+from language_model import log_probabilities
+from ngram_engine import encode_letters, ngram_array, ngram_codes
+
+# Корпус, з якого будуються референсні таблиці біграм і триграм
+REFERENCE_CORPUS = 'text1.txt'
+
+def build_reference_tables(corpus_text, alphabet=LOWER_ALPHABET):
+    """
+    Будує з корпусу таблиці логарифмів ймовірностей біграм (m*m) та триграм (m**3)
+    зі згладжуванням.
+    """
+    m = len(alphabet)
+    codes = encode_letters(corpus_text, alphabet)
+    return log_probabilities(ngram_array(codes, 2, m)), log_probabilities(ngram_array(codes, 3, m))
+
+class _NgramTerm:
+    """
+    Розріджене представлення n-грам шифротексту: різні n-грами, їх кількості
+    та маска входження кожної літери шифротексту.
+    """
+
+    def __init__(self, codes, n, m, log_probs, weight):
+        unique, counts = np.unique(ngram_codes(codes, n, m), return_counts=True)
+        self.n = n
+        self.m = m
+        self.weights = counts * weight
+        self.letters = np.array([(unique // m ** (n - 1 - k)) % m for k in range(n)])
+        self.log_probs = log_probs
+        self.contains = np.zeros((m, len(unique)), dtype=bool)
+        for row in self.letters:
+            self.contains[row, np.arange(len(unique))] = True
+
+    def score(self, key, entries=None):
+        """
+        Логарифмічна правдоподібність n-грам (або лише вибраних записів) при ключі key.
+        """
+        letters = self.letters if entries is None else self.letters[:, entries]
+        weights = self.weights if entries is None else self.weights[entries]
+        plain = key[letters[0]]
+        for row in letters[1:]:
+            plain = plain * self.m + key[row]
+        return float((weights * self.log_probs[plain]).sum())
+
+    def delta(self, key, swapped, u, v):
+        """
+        Зміна оцінки при обміні відкритих літер для літер шифротексту u та v.
+        Перераховуються лише n-грами, що містять u або v.
+        """
+        entries = np.flatnonzero(self.contains[u] | self.contains[v])
+        if len(entries) == 0:
+            return 0.0
+        return self.score(swapped, entries) - self.score(key, entries)
+
+class SubstitutionScorer:
+    """
+    Оцінювач ключа підстановки за матрицями частот біграм і триграм шифротексту.
+    Ключ — масив key[літера шифротексту] = літера відкритого тексту.
+    """
+
+    def __init__(self, cipher_text, bigram_logp, trigram_logp, trigram_weight=1.0, alphabet=LOWER_ALPHABET):
+        self.m = len(alphabet)
+        codes = encode_letters(cipher_text, alphabet)
+        self.letter_counts = ngram_array(codes, 1, self.m)
+        self.terms = [_NgramTerm(codes, 2, self.m, bigram_logp, 1.0)]
+        if trigram_weight:
+            self.terms.append(_NgramTerm(codes, 3, self.m, trigram_logp, trigram_weight))
+
+    def score(self, key):
+        return sum(term.score(key) for term in self.terms)
+
+    def swap_delta(self, key, swapped, u, v):
+        return sum(term.delta(key, swapped, u, v) for term in self.terms)
+
+def frequency_key(scorer, letter_freq, alphabet=LOWER_ALPHABET):
+    """
+    Початковий ключ: літери шифротексту за спаданням частоти зіставляються
+    з літерами мови за спаданням референсної частоти.
+    """
+    cipher_order = np.argsort(-scorer.letter_counts, kind='stable')
+    language_order = sorted(range(len(alphabet)), key=lambda i: -letter_freq.get(alphabet[i], 0.0))
+    key = np.zeros(len(alphabet), dtype=np.int64)
+    key[cipher_order] = language_order
+    return key
+
+def hill_climb(scorer, key, rng=None, temperature=0.0, cooling=0.9, max_sweeps=200, should_stop=None):
+    """
+    Покращує ключ обмінами пар літер. При temperature > 0 працює як імітація відпалу:
+    погіршення приймається з ймовірністю exp(delta / T), а T множиться на cooling
+    після кожного проходу. Зупиняється, коли прохід не дав покращення (і T вже мала).
+    should_stop — необов'язкова функція, яка перевіряється після кожного проходу.
+    Повертає (найкращий ключ, його оцінка, кількість перевірених обмінів).
+    """
+    rng = rng or random.Random()
+    m = scorer.m
+    pairs = [(u, v) for u in range(m) for v in range(u + 1, m)]
+    key = key.copy()
+    current = scorer.score(key)
+    best_key, best = key.copy(), current
+    iterations = 0
+    for _ in range(max_sweeps):
+        rng.shuffle(pairs)
+        improved = False
+        for u, v in pairs:
+            swapped = key.copy()
+            swapped[u], swapped[v] = key[v], key[u]
+            delta = scorer.swap_delta(key, swapped, u, v)
+            iterations += 1
+            if delta > 1e-9 or (temperature > 0 and rng.random() < math.exp(delta / temperature)):
+                key, current = swapped, current + delta
+                if delta > 1e-9:
+                    improved = True
+                if current > best:
+                    best_key, best = key.copy(), current
+        temperature *= cooling
+        if not improved and temperature < 1e-3:
+            break
+        if should_stop is not None and should_stop():
+            break
+    return best_key, best, iterations
+
+def key_to_mapping(key, alphabet=LOWER_ALPHABET):
+    """
+    Перетворює ключ у карту відповідності (літера шифротексту -> літера відкритого тексту)
+    для малих і великих літер, сумісну з apply_mapping.
+    """
+    alphabet = get_alphabet(alphabet)
+    to_upper = alphabet.to_upper
+    mapping = {alphabet[c]: alphabet[p] for c, p in enumerate(key)}
+    # Символи без великої форми (апостроф) мають лише один запис
+    mapping.update({to_upper[alphabet[c]]: to_upper[alphabet[p]] for c, p in enumerate(key)
+                    if to_upper[alphabet[c]] != alphabet[c]})
+    return mapping
+
+def solve(cipher_text, bigram_logp, trigram_logp, letter_freq, restarts=5, temperature=0.0, seed=None, alphabet=LOWER_ALPHABET):
+    """
+    Відновлює повний ключ підстановки. Перший запуск стартує з частотного ключа,
+    решта — з випадкових перестановок. Повертає словник з картою відповідності,
+    оцінкою, кількістю ітерацій, часом роботи та швидкістю (ітерацій/с).
+    """
+    rng = random.Random(seed)
+    scorer = SubstitutionScorer(cipher_text, bigram_logp, trigram_logp, alphabet=alphabet)
+    start_key = frequency_key(scorer, letter_freq, alphabet)
+    best_key, best, total_iterations = None, -math.inf, 0
+    started = time.perf_counter()
+    for restart in range(restarts):
+        if restart == 0:
+            key = start_key
+        else:
+            key = np.array(rng.sample(range(len(alphabet)), len(alphabet)), dtype=np.int64)
+        key, score, iterations = hill_climb(scorer, key, rng, temperature)
+        total_iterations += iterations
+        if score > best:
+            best_key, best = key, score
+    elapsed = time.perf_counter() - started
+    return {
+        'mapping': key_to_mapping(best_key, alphabet),
+        'key': best_key,
+        'score': best,
+        'iterations': total_iterations,
+        'elapsed': elapsed,
+        'iterations_per_second': total_iterations / elapsed if elapsed else float('inf'),
+    }
+
+# Стан процесу-виконавця для паралельних перезапусків
+_worker = {}
+
+def _init_worker(cipher_text, bigram_logp, trigram_logp, letter_freq, alphabet, temperature,
+                 best_score, best_key, stop_event, target_score):
+    """
+    Ініціалізує процес пулу: будує оцінювач один раз і зберігає спільні об'єкти.
+    """
+    scorer = SubstitutionScorer(cipher_text, bigram_logp, trigram_logp, alphabet=alphabet)
+    _worker.update(
+        scorer=scorer,
+        start_key=frequency_key(scorer, letter_freq, alphabet),
+        temperature=temperature,
+        best_score=best_score,
+        best_key=best_key,
+        stop_event=stop_event,
+        target_score=target_score,
+    )
+
+def _run_restart(task):
+    """
+    Виконує один перезапуск із заданим зерном і публікує результат як спільний найкращий,
+    якщо він кращий. Повертає (оцінка, ключ, ітерації) або None, якщо пошук уже зупинено.
+    """
+    index, seed = task
+    stop_event = _worker['stop_event']
+    if stop_event.is_set():
+        return None
+    scorer = _worker['scorer']
+    rng = random.Random(seed)
+    if index == 0:
+        key = _worker['start_key']
+    else:
+        key = np.array(rng.sample(range(scorer.m), scorer.m), dtype=np.int64)
+    key, score, iterations = hill_climb(scorer, key, rng, _worker['temperature'], should_stop=stop_event.is_set)
+
+    best_score, best_key = _worker['best_score'], _worker['best_key']
+    with best_score.get_lock():
+        if score > best_score.value:
+            best_score.value = score
+            best_key[:] = [int(x) for x in key]
+    target = _worker['target_score']
+    if target is not None and score >= target:
+        stop_event.set()
+    return score, key, iterations
+
+def parallel_solve(cipher_text, bigram_logp, trigram_logp, letter_freq, restarts=32, workers=None,
+                   target_score=None, temperature=0.0, seed=None, alphabet=LOWER_ALPHABET):
+    """
+    Запускає restarts незалежних перезапусків у пулі з workers процесів (за замовчуванням —
+    усі ядра), кожен зі своїм зерном. Найкращий ключ спільний для всіх процесів;
+    щойно оцінка досягає target_score, решта перезапусків скасовується.
+    Повертає словник того ж формату, що й solve, з додатковою кількістю виконаних перезапусків.
+    """
+    workers = workers or os.cpu_count() or 1
+    base_seed = random.Random(seed).randrange(2 ** 32)
+    m = len(alphabet)
+    best_score = multiprocessing.Value('d', -math.inf)
+    best_key = multiprocessing.Array('q', m, lock=False)
+    stop_event = multiprocessing.Event()
+    tasks = [(index, base_seed + index) for index in range(restarts)]
+
+    started = time.perf_counter()
+    total_iterations, completed = 0, 0
+    with multiprocessing.Pool(
+        workers,
+        initializer=_init_worker,
+        initargs=(cipher_text, bigram_logp, trigram_logp, letter_freq, alphabet, temperature,
+                  best_score, best_key, stop_event, target_score),
+    ) as pool:
+        for result in pool.imap_unordered(_run_restart, tasks):
+            if result is None:
+                continue
+            total_iterations += result[2]
+            completed += 1
+            if stop_event.is_set():
+                break
+    elapsed = time.perf_counter() - started
+
+    key = np.array(best_key[:], dtype=np.int64)
+    return {
+        'mapping': key_to_mapping(key, alphabet),
+        'key': key,
+        'score': best_score.value,
+        'iterations': total_iterations,
+        'restarts': completed,
+        'elapsed': elapsed,
+        'iterations_per_second': total_iterations / elapsed if elapsed else float('inf'),
+    }
@@ -1,32 +1,25 @@
-import sys
+import argparse
 from collections import Counter
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
 import json
+import plotting
+from alphabet import UKRAINIAN
+from corpus_stream import stream_ngram_counts
+from ngram_engine import count_ngrams
 
 # Український алфавіт
-UKRAINIAN_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
+UKRAINIAN_ALPHABET = UKRAINIAN
 
 def clean_text(text):
     """
     Очищає текст: перетворює у нижній регістр та видаляє всі символи, крім літер українського алфавіту та пробілів.
     """
-    text = text.lower()
-    allowed_chars = set(UKRAINIAN_ALPHABET + [' '])
-    cleaned = ''.join(char for char in text if char in allowed_chars)
-    return cleaned
+    return UKRAINIAN_ALPHABET.clean(text, keep=' ')
 
 def count_letters(text):
     """
     Підраховує кількість кожної літери в тексті.
     """
-    return Counter(text.replace(' ', ''))
+    return count_ngrams(text.replace(' ', ''), 1)
 
 def relative_frequency(counter):
     """
@@ -39,6 +32,11 @@ def plot_alphabetical(freq_dict, title):
     """
     Будує діаграму відносної частоти літер у алфавітному порядку.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     letters = sorted(freq_dict.keys())
     frequencies = [freq_dict[letter] for letter in letters]
     
@@ -48,12 +46,17 @@ def plot_alphabetical(freq_dict, title):
     plt.xlabel('Літери')
     plt.ylabel('Відносна частота')
     plt.tight_layout()
-    plt.show()
+    plotting.show('plot_alphabetical')
 
 def plot_sorted(freq_dict, title):
     """
     Будує діаграму відносної частоти літер, відсортовану за спаданням.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     sorted_items = sorted(freq_dict.items(), key=lambda item: item[1], reverse=True)
     letters, frequencies = zip(*sorted_items)
     
@@ -63,7 +66,7 @@ def plot_sorted(freq_dict, title):
     plt.xlabel('Літери')
     plt.ylabel('Відносна частота')
     plt.tight_layout()
-    plt.show()
+    plotting.show('plot_sorted')
 
 def print_sorted_sequence(freq_dict):
     """
@@ -82,11 +85,8 @@ def main(file_paths):
     
     for file_path in file_paths:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-                cleaned = clean_text(text)
-                letter_counts = count_letters(cleaned)
-                combined_counter.update(letter_counts)
+            # Потокове зчитування: пам'ять не залежить від розміру файлу
+            combined_counter.update(stream_ngram_counts(file_path, 1))
         except Exception as e:
             print(f"Помилка при обробці файлу {file_path}: {e}")
             continue
@@ -108,7 +108,9 @@ def main(file_paths):
     print_sorted_sequence(freq)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Використання: python3 task1_letter_frequency.py <file1> <file2> ...")
-    else:
-        main(sys.argv[1:])
+    parser = argparse.ArgumentParser(description='Частотні характеристики літер.')
+    parser.add_argument('files', nargs='+', metavar='file', help='файли корпусу')
+    plotting.add_arguments(parser)
+    args = parser.parse_args()
+    plotting.configure(args.headless, args.save_figures)
+    main(args.files)
@@ -1,33 +1,21 @@
-import sys
+import argparse
 from collections import Counter
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
 import json
+import numpy as np
+import plotting
+from alphabet import UKRAINIAN
+from corpus_stream import stream_ngram_counts
+from ngram_sketch import NgramSketch, build_sketch, print_top
+from ngram_tensor import ngram_tensor, tensor_from_mapping, normalize, conditional, plot_heatmap
 
 # Український алфавіт
-UKRAINIAN_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
+UKRAINIAN_ALPHABET = UKRAINIAN
 
 def clean_text(text):
     """
     Очищає текст: перетворює у нижній регістр та видаляє всі символи, крім літер українського алфавіту та пробілів.
     """
-    text = text.lower()
-    allowed_chars = set(UKRAINIAN_ALPHABET + [' '])
-    cleaned = ''.join(char for char in text if char in allowed_chars)
-    return cleaned
-
-def count_ngrams(text, n):
-    """
-    Підраховує кількість n-грам в тексті.
-    """
-    ngrams = [text[i:i+n] for i in range(len(text)-n+1)]
-    return Counter(ngrams)
+    return UKRAINIAN_ALPHABET.clean(text, keep=' ')
 
 def relative_frequency_ngrams(counter):
     """
@@ -49,6 +37,11 @@ def plot_bigrams(freq_dict, title):
     """
     Будує діаграму відносної частоти 30 найбільш імовірних біграм.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     sorted_items = sorted(freq_dict.items(), key=lambda item: item[1], reverse=True)[:30]
     bigrams, frequencies = zip(*sorted_items)
     
@@ -59,28 +52,19 @@ def plot_bigrams(freq_dict, title):
     plt.ylabel('Відносна частота')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plotting.show('plot_bigrams')
 
-def create_bigrams_matrix(freq_dict):
+def create_bigrams_matrix(matrix):
     """
-    Створює теплову карту частот появи біграм.
+    Будує теплові карти матриці частот біграм 33x33 (кількості або частоти)
+    та умовних ймовірностей P(друга літера | перша).
     """
-    letters = UKRAINIAN_ALPHABET
-    matrix = pd.DataFrame(0, index=letters, columns=letters)
-    
-    for bigram, freq in freq_dict.items():
-        if len(bigram) == 2:
-            first, second = bigram
-            if first in letters and second in letters:
-                matrix.at[first, second] = freq
-    
-    plt.figure(figsize=(12,10))
-    sns.heatmap(matrix, annot=False, cmap='Blues')
-    plt.title('Матриця частот біграм')
-    plt.xlabel('Друга літера')
-    plt.ylabel('Перша літера')
-    plt.tight_layout()
-    plt.show()
+    if not plotting.enabled():
+        return
+    plot_heatmap(normalize(matrix), 'Матриця частот біграм', 'create_bigrams_matrix',
+                 'Друга літера', 'Перша літера', 'Blues', UKRAINIAN_ALPHABET)
+    plot_heatmap(conditional(matrix), 'Умовні ймовірності P(друга літера | перша)', 'bigrams_conditional',
+                 'Друга літера', 'Перша літера', 'Blues', UKRAINIAN_ALPHABET)
 
 def save_frequencies_to_json(data, filename):
     """
@@ -90,19 +74,25 @@ def save_frequencies_to_json(data, filename):
         json.dump(data, f, ensure_ascii=False, indent=4)
     print(f"Частоти збережено у файлі '{filename}'.")
 
-def main(file_paths):
+def main(file_paths, approximate=None):
     """
     Основна функція для підрахунку та виводу частотних характеристик біграм.
+    approximate — бюджет пам'яті (наприклад, '8MB') для наближеного підрахунку ескізами.
     """
+    if approximate:
+        main_approximate(file_paths, approximate)
+        return
+
     combined_bigrams = Counter()
+    # Щільна матриця 33x33 будується з цілочисельних частот без повторного проходу
+    bigram_matrix = np.zeros((len(UKRAINIAN_ALPHABET),) * 2, dtype=np.int64)
     
     for file_path in file_paths:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-                cleaned = clean_text(text)
-                bigrams = count_ngrams(cleaned.replace(' ', ''), 2)
-                combined_bigrams.update(bigrams)
+            # Потокове зчитування: пам'ять не залежить від розміру файлу
+            counts = stream_ngram_counts(file_path, 2)
+            combined_bigrams.update(counts)
+            bigram_matrix += ngram_tensor(counts, 2)
         except Exception as e:
             print(f"Помилка при обробці файлу {file_path}: {e}")
             continue
@@ -115,6 +105,7 @@ def main(file_paths):
     save_frequencies_to_json(top_bigrams_freq, 'top30_bigrams.json')
     
     # Таблиця біграм, відсортована за спаданням частоти
+    import pandas as pd
     sorted_bigrams = sorted(freq_bigrams.items(), key=lambda item: item[1], reverse=True)
     df_bigrams = pd.DataFrame(sorted_bigrams, columns=['Біграм', 'Відносна частота'])
     print("\nТаблиця біграм (сортування за спаданням частоти):")
@@ -127,7 +118,33 @@ def main(file_paths):
     plot_bigrams(freq_bigrams, 'Відносна частота 30 найбільш імовірних біграм')
     
     # Матриця частот біграм
-    create_bigrams_matrix(freq_bigrams)
+    create_bigrams_matrix(bigram_matrix)
+
+def main_approximate(file_paths, memory):
+    """
+    Наближений підрахунок біграм у межах бюджету пам'яті (Space-Saving і Count-Min):
+    топ-30 з межами похибки замість повної таблиці. Ескіз кожного файлу зливається із загальним.
+    """
+    combined = NgramSketch(2, memory)
+
+    for file_path in file_paths:
+        try:
+            combined.merge(build_sketch([file_path], 2, memory))
+        except Exception as e:
+            print(f"Помилка при обробці файлу {file_path}: {e}")
+            continue
+
+    # Збереження топ-30 біграм у JSON (кількості — верхні межі оцінок)
+    top_bigrams = get_most_frequent_ngrams(combined, n=30)
+    save_frequencies_to_json(dict(top_bigrams), 'top30_bigrams.json')
+
+    # Топ-30 біграм з межами похибки
+    print_top(combined, 30)
+
+    total = combined.total or 1
+    freq_bigrams = {ngram: count / total for ngram, count in top_bigrams}
+    plot_bigrams(freq_bigrams, 'Відносна частота 30 найбільш імовірних біграм (наближено)')
+    create_bigrams_matrix(tensor_from_mapping(freq_bigrams, 2))
 
 def get_most_frequent_ngrams(counter, n=30):
     """
@@ -136,7 +153,11 @@ def get_most_frequent_ngrams(counter, n=30):
     return counter.most_common(n)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Використання: python3 task2_bigram_frequency.py <file1> <file2> ...")
-    else:
-        main(sys.argv[1:])
+    parser = argparse.ArgumentParser(description='Частотні характеристики біграм.')
+    parser.add_argument('files', nargs='+', metavar='file', help='файли корпусу')
+    parser.add_argument('--approximate', default=None, metavar='MEMORY',
+                        help="наближений підрахунок ескізами в межах бюджету пам'яті (наприклад, 8MB)")
+    plotting.add_arguments(parser)
+    args = parser.parse_args()
+    plotting.configure(args.headless, args.save_figures)
+    main(args.files, args.approximate)
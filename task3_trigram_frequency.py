@@ -1,33 +1,21 @@
-import sys
+import argparse
 from collections import Counter
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
 import json
+import numpy as np
+import plotting
+from alphabet import UKRAINIAN
+from corpus_stream import stream_ngram_counts
+from ngram_sketch import NgramSketch, build_sketch, print_top
+from ngram_tensor import ngram_tensor, tensor_from_mapping, marginal, conditional, plot_heatmap, plot_slices
 
 # Український алфавіт
-UKRAINIAN_ALPHABET = [
-    'а', 'б', 'в', 'г', 'ґ', 'д', 'е', 'є', 'ж', 'з',
-    'и', 'і', 'ї', 'й', 'к', 'л', 'м', 'н', 'о', 'п',
-    'р', 'с', 'т', 'у', 'ф', 'х', 'ц', 'ч', 'ш', 'щ',
-    'ь', 'ю', 'я'
-]
+UKRAINIAN_ALPHABET = UKRAINIAN
 
 def clean_text(text):
     """
     Очищає текст: перетворює у нижній регістр та видаляє всі символи, крім літер українського алфавіту та пробілів.
     """
-    text = text.lower()
-    allowed_chars = set(UKRAINIAN_ALPHABET + [' '])
-    cleaned = ''.join(char for char in text if char in allowed_chars)
-    return cleaned
-
-def count_ngrams(text, n):
-    """
-    Підраховує кількість n-грам в тексті.
-    """
-    ngrams = [text[i:i+n] for i in range(len(text)-n+1)]
-    return Counter(ngrams)
+    return UKRAINIAN_ALPHABET.clean(text, keep=' ')
 
 def relative_frequency_ngrams(counter):
     """
@@ -49,6 +37,11 @@ def plot_trigrams(freq_dict, title):
     """
     Будує діаграму відносної частоти 30 найбільш імовірних триграм.
     """
+    if not plotting.enabled():
+        return
+    plt = plotting.pyplot()
+    sns = plotting.seaborn()
+
     sorted_items = sorted(freq_dict.items(), key=lambda item: item[1], reverse=True)[:30]
     trigrams, frequencies = zip(*sorted_items)
     
@@ -59,29 +52,20 @@ def plot_trigrams(freq_dict, title):
     plt.ylabel('Відносна частота')
     plt.xticks(rotation=90)
     plt.tight_layout()
-    plt.show()
+    plotting.show('plot_trigrams')
 
-def create_trigrams_matrix(freq_dict):
-    """
-    Створює теплову карту частот появи триграм.
-    """
-    letters = UKRAINIAN_ALPHABET
-    matrix = pd.DataFrame(0, index=letters, columns=letters)
-    
-    for trigram, freq in freq_dict.items():
-        if len(trigram) == 3:
-            first, second, third = trigram
-            if first in letters and second in letters and third in letters:
-                # Для теплової карти ми можемо розглядати тільки першу дві літери
-                matrix.at[first, second] += freq  # Або інший підхід для триграм
-                # Зверніть увагу: матриця для триграм складніша, тому для спрощення ми використовуємо тільки перші дві літери
-    plt.figure(figsize=(12,10))
-    sns.heatmap(matrix, annot=False, cmap='Greens')
-    plt.title('Матриця частот триграм')
-    plt.xlabel('Друга літера')
-    plt.ylabel('Перша літера')
-    plt.tight_layout()
-    plt.show()
+def create_trigrams_matrix(tensor):
+    """
+    Будує теплові карти тензора частот триграм 33x33x33: маргінальну матрицю
+    (перша, друга літера) та окрему панель для кожної першої літери з умовними
+    частотами P(друга, третя | перша).
+    """
+    if not plotting.enabled():
+        return
+    plot_heatmap(marginal(tensor, (0, 1)), 'Матриця частот триграм (перша і друга літери)', 'create_trigrams_matrix',
+                 'Друга літера', 'Перша літера', 'Greens', UKRAINIAN_ALPHABET)
+    plot_slices(conditional(tensor, 0), 'Частоти триграм за першою літерою: P(друга, третя | перша)',
+                'trigram_slices', 'Greens', UKRAINIAN_ALPHABET)
 
 def save_frequencies_to_json(data, filename):
     """
@@ -91,19 +75,25 @@ def save_frequencies_to_json(data, filename):
         json.dump(data, f, ensure_ascii=False, indent=4)
     print(f"Частоти збережено у файлі '{filename}'.")
 
-def main(file_paths):
+def main(file_paths, approximate=None):
     """
     Основна функція для підрахунку та виводу частотних характеристик триграм.
+    approximate — бюджет пам'яті (наприклад, '8MB') для наближеного підрахунку ескізами.
     """
+    if approximate:
+        main_approximate(file_paths, approximate)
+        return
+
     combined_trigrams = Counter()
+    # Тензор 33x33x33 зберігає всі три літери і будується з цілочисельних частот
+    trigram_tensor = np.zeros((len(UKRAINIAN_ALPHABET),) * 3, dtype=np.int64)
     
     for file_path in file_paths:
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
-                cleaned = clean_text(text)
-                trigrams = count_ngrams(cleaned.replace(' ', ''), 3)
-                combined_trigrams.update(trigrams)
+            # Потокове зчитування: пам'ять не залежить від розміру файлу
+            counts = stream_ngram_counts(file_path, 3)
+            combined_trigrams.update(counts)
+            trigram_tensor += ngram_tensor(counts, 3)
         except Exception as e:
             print(f"Помилка при обробці файлу {file_path}: {e}")
             continue
@@ -116,6 +106,7 @@ def main(file_paths):
     save_frequencies_to_json(top_trigrams_freq, 'top30_trigrams.json')
     
     # Таблиця триграм, відсортована за спаданням частоти
+    import pandas as pd
     sorted_trigrams = sorted(freq_trigrams.items(), key=lambda item: item[1], reverse=True)
     df_trigrams = pd.DataFrame(sorted_trigrams, columns=['Триграм', 'Відносна частота'])
     print("\nТаблиця триграм (сортування за спаданням частоти):")
@@ -128,7 +119,33 @@ def main(file_paths):
     plot_trigrams(freq_trigrams, 'Відносна частота 30 найбільш імовірних триграм')
     
     # Матриця частот триграм
-    create_trigrams_matrix(freq_trigrams)
+    create_trigrams_matrix(trigram_tensor)
+
+def main_approximate(file_paths, memory):
+    """
+    Наближений підрахунок триграм у межах бюджету пам'яті (Space-Saving і Count-Min):
+    топ-30 з межами похибки замість повної таблиці. Ескіз кожного файлу зливається із загальним.
+    """
+    combined = NgramSketch(3, memory)
+
+    for file_path in file_paths:
+        try:
+            combined.merge(build_sketch([file_path], 3, memory))
+        except Exception as e:
+            print(f"Помилка при обробці файлу {file_path}: {e}")
+            continue
+
+    # Збереження топ-30 триграм у JSON (кількості — верхні межі оцінок)
+    top_trigrams = get_most_frequent_ngrams(combined, n=30)
+    save_frequencies_to_json(dict(top_trigrams), 'top30_trigrams.json')
+
+    # Топ-30 триграм з межами похибки
+    print_top(combined, 30)
+
+    total = combined.total or 1
+    freq_trigrams = {ngram: count / total for ngram, count in top_trigrams}
+    plot_trigrams(freq_trigrams, 'Відносна частота 30 найбільш імовірних триграм (наближено)')
+    create_trigrams_matrix(tensor_from_mapping(freq_trigrams, 3))
 
 def get_most_frequent_ngrams(counter, n=30):
     """
@@ -137,7 +154,11 @@ def get_most_frequent_ngrams(counter, n=30):
     return counter.most_common(n)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Використання: python3 task3_trigram_frequency.py <file1> <file2> ...")
-    else:
-        main(sys.argv[1:])
+    parser = argparse.ArgumentParser(description='Частотні характеристики триграм.')
+    parser.add_argument('files', nargs='+', metavar='file', help='файли корпусу')
+    parser.add_argument('--approximate', default=None, metavar='MEMORY',
+                        help="наближений підрахунок ескізами в межах бюджету пам'яті (наприклад, 8MB)")
+    plotting.add_arguments(parser)
+    args = parser.parse_args()
+    plotting.configure(args.headless, args.save_figures)
+    main(args.files, args.approximate)
@@ -0,0 +1,243 @@
+import os
+import json
+import argparse
+import numpy as np
+
+from affine_tables import LOWER_ALPHABET
+from affine_search import reference_log_probs, letter_scores
+from alphabet import get_alphabet
+from corpus_stream import iter_chunks
+from language_model import MODEL_FILE, load_model
+from ngram_engine import code_points, encode_letters, ngram_codes
+
+# Найбільший період, що перевіряється за замовчуванням
+MAX_PERIOD = 30
+
+# Кількість літер, що обробляються за один крок підрахунку індексу збігу
+BLOCK_SIZE = 1 << 14
+
+# Обирається найменший період, чий індекс збігу досягає цієї частки шляху
+# від випадкового тексту (1/m) до найкращого періоду: кратні справжнього періоду
+# мають такий самий індекс, тож найбільший індекс не завжди відповідає найменшому періоду
+IOC_RATIO = 0.8
+
+def parse_key(key, alphabet=LOWER_ALPHABET):
+    """
+    Перетворює ключове слово на масив зсувів (індексів літер).
+    """
+    alphabet = get_alphabet(alphabet)
+    shifts = [alphabet.case_index[char] for char in key if char in alphabet.case_index]
+    if not shifts:
+        raise ValueError(f"Ключ '{key}' не містить літер алфавіту.")
+    return np.array(shifts, dtype=np.int64)
+
+def vigenere_translate(text, key, decrypt=False, alphabet=LOWER_ALPHABET):
+    """
+    Шифрує або дешифрує текст шифром Віженера. Зсув береться з ключа за номером літери
+    (інші символи не зсувають ключ і залишаються без змін); регістр зберігається.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    shifts = parse_key(key, alphabet) if isinstance(key, str) else np.asarray(key, dtype=np.int64)
+    points = code_points(text)
+    table = alphabet.code_table(True)
+    lower_table = alphabet.code_table(False)
+    inside = points < len(table)
+    indices = np.full(len(points), -1, dtype=np.int64)
+    indices[inside] = table[points[inside]]
+    letters = indices >= 0
+    upper = letters.copy()
+    upper[inside] &= lower_table[points[inside]] < 0
+    phase = np.cumsum(letters)[letters] - 1
+    sign = -1 if decrypt else 1
+    shifted = (indices[letters] + sign * shifts[phase % len(shifts)]) % m
+    lower_points = np.array([ord(char) for char in alphabet.letters], dtype=np.uint32)
+    upper_points = np.array([ord(char) for char in alphabet.upper_letters], dtype=np.uint32)
+    result = points.copy()
+    result[letters] = np.where(upper[letters], upper_points[shifted], lower_points[shifted])
+    return result.tobytes().decode('utf-32-le')
+
+def column_counts(codes, max_period=MAX_PERIOD, m=None, block_size=BLOCK_SIZE):
+    """
+    Частоти літер у кожному стовпці для всіх періодів 1..max_period за один прохід
+    по тексту блоками. Повертає список масивів форми (p, m): counts[p - 1][j, x] — кількість
+    літери x на позиціях i ≡ j (mod p). Усі періоди рахуються одним np.bincount на блок.
+    """
+    m = m or len(LOWER_ALPHABET)
+    periods = list(range(1, max_period + 1))
+    # Зміщення масиву періоду p у спільному плоскому масиві: m * (1 + 2 + ... + (p - 1))
+    offsets = [m * (p * (p - 1) // 2) for p in periods]
+    size = m * max_period * (max_period + 1) // 2
+    flat = np.zeros(size, dtype=np.int64)
+    # Готові індекси стовпців (зі зміщенням) для кожного періоду: замість обчислення
+    # остачі для кожної літери блоку береться зріз шаблону, що починається з start % p
+    patterns = [offset + (np.arange(block_size + p) % p) * m for p, offset in zip(periods, offsets)]
+    index = np.empty((max_period, block_size), dtype=np.intp)
+    for start in range(0, len(codes), block_size):
+        block = codes[start:start + block_size]
+        n = len(block)
+        for row, p in enumerate(periods):
+            shift = start % p
+            np.add(patterns[row][shift:shift + n], block, out=index[row, :n])
+        flat += np.bincount(index[:, :n].ravel(), minlength=size)
+    return [flat[offset:offset + p * m].reshape(p, m) for p, offset in zip(periods, offsets)]
+
+def index_of_coincidence(counts):
+    """
+    Середній індекс збігу стовпців: для кожного стовпця sum c(c - 1) / (n(n - 1)).
+    """
+    totals = counts.sum(axis=1)
+    valid = totals > 1
+    if not valid.any():
+        return 0.0
+    coincidences = (counts[valid] * (counts[valid] - 1)).sum(axis=1)
+    return float(np.mean(coincidences / (totals[valid] * (totals[valid] - 1))))
+
+def kasiski(codes, max_period=MAX_PERIOD, m=None):
+    """
+    Тест Касіскі: відстані між сусідніми повтореннями однакових триграм. Для кожного
+    періоду p повертає частку відстаней, кратних p, помножену на p (близько 1 для
+    випадкових повторень і помітно більше для справжнього періоду та його кратних).
+    """
+    m = m or len(LOWER_ALPHABET)
+    grams = ngram_codes(codes, 3, m)
+    scores = np.zeros(max_period, dtype=np.float64)
+    if len(grams) < 2:
+        return scores, 0
+    # Коди триграм (< 33**3) вміщуються в uint16, для якого стабільне сортування — порозрядне
+    order = np.argsort(grams.astype(np.uint16) if m ** 3 <= 1 << 16 else grams, kind='stable')
+    repeated = grams[order[1:]] == grams[order[:-1]]
+    spacings = (order[1:] - order[:-1])[repeated]
+    if not len(spacings):
+        return scores, 0
+    histogram = np.bincount(spacings)
+    for p in range(1, max_period + 1):
+        scores[p - 1] = histogram[p::p].sum() / len(spacings) * p
+    return scores, len(spacings)
+
+def choose_period(ioc, m, ratio=IOC_RATIO):
+    """
+    Найменший період, чий індекс збігу не нижчий за 1/m + ratio * (max - 1/m).
+    """
+    ioc = np.asarray(ioc)
+    threshold = 1.0 / m + ratio * (ioc.max() - 1.0 / m)
+    passing = np.flatnonzero(ioc >= threshold)
+    return int(passing[0]) + 1 if len(passing) else 1
+
+def solve_columns(counts, letter_logp, method='loglik', alphabet=LOWER_ALPHABET):
+    """
+    Зсув кожного стовпця: стовпець — афінний шифр з a = 1, тож усі 33 зсуви
+    оцінюються частотною кореляцією з affine_search без дешифрування.
+    Повертає масив зсувів і масив оцінок найкращих зсувів.
+    """
+    m = len(alphabet)
+    keys = np.array([(1, b) for b in range(m)], dtype=np.int64)
+    shifts, scores = [], []
+    for column in counts:
+        column_scores = letter_scores(keys, column.astype(np.float64), letter_logp, method, alphabet)
+        best = int(np.argmax(column_scores))
+        shifts.append(best)
+        scores.append(float(column_scores[best]))
+    return np.array(shifts, dtype=np.int64), np.array(scores)
+
+def reference_letters(reference_file='freq_reference.json', model_file=MODEL_FILE, alphabet=LOWER_ALPHABET):
+    """
+    Логарифми ймовірностей літер: з бінарної моделі мови, якщо вона є, інакше з JSON.
+    """
+    if os.path.exists(model_file):
+        model = load_model(model_file)
+        letter_logp = np.array(model.letters, dtype=np.float64)
+        model.close()
+        return letter_logp
+    with open(reference_file, 'r', encoding='utf-8') as f:
+        letter_freq = json.load(f)
+    return reference_log_probs(letter_freq, {}, alphabet)[0]
+
+def read_codes(file_path, alphabet=LOWER_ALPHABET):
+    """
+    Зчитує файл частинами і кодує лише літери (1 байт на літеру).
+    """
+    return np.concatenate([encode_letters(chunk, alphabet) for chunk in iter_chunks(file_path)] or
+                          [np.zeros(0, dtype=np.uint8)])
+
+def analyze(codes, max_period=MAX_PERIOD, method='loglik', letter_logp=None, alphabet=LOWER_ALPHABET):
+    """
+    Повний аналіз: індекс збігу для періодів 1..max_period, тест Касіскі, вибір періоду
+    та зсуви стовпців. Повертає словник з результатами.
+    """
+    alphabet = get_alphabet(alphabet)
+    m = alphabet.m
+    max_period = max(1, min(max_period, len(codes) // 2 or 1))
+    if letter_logp is None:
+        letter_logp = reference_letters(alphabet=alphabet)
+    counts = column_counts(codes, max_period, m)
+    ioc = [index_of_coincidence(period_counts) for period_counts in counts]
+    kasiski_scores, repeats = kasiski(codes, max_period, m)
+    period = choose_period(ioc, m)
+    shifts, scores = solve_columns(counts[period - 1], letter_logp, method, alphabet)
+    return {
+        'period': period,
+        'key': ''.join(alphabet[shift] for shift in shifts.tolist()),
+        'shifts': shifts.tolist(),
+        'column_scores': scores.tolist(),
+        'ioc': ioc,
+        'reference_ioc': float(np.exp(2 * letter_logp).sum()),
+        'kasiski': kasiski_scores.tolist(),
+        'repeats': repeats,
+        'letters': len(codes),
+    }
+
+def main(input_path, max_period=MAX_PERIOD, method='loglik', output_path=None, preview=300):
+    """
+    Аналізує шифротекст Віженера у файлі: виводить індекс збігу та оцінку Касіскі
+    для кожного періоду, знайдений ключ і початок розшифрованого тексту.
+    """
+    try:
+        codes = read_codes(input_path)
+    except FileNotFoundError:
+        print(f"Файл '{input_path}' не знайдено.")
+        return None
+    result = analyze(codes, max_period, method)
+    m = len(LOWER_ALPHABET)
+    print(f"Літер у шифротексті: {result['letters']}, повторень триграм: {result['repeats']}.")
+    print(f"Індекс збігу: мова ≈ {result['reference_ioc']:.4f}, випадковий текст ≈ {1 / m:.4f}.")
+    print("Період | Індекс збігу | Касіскі")
+    for p, (ioc, score) in enumerate(zip(result['ioc'], result['kasiski']), start=1):
+        marker = ' <-' if p == result['period'] else ''
+        print(f"{p:6d} | {ioc:12.4f} | {score:7.2f}{marker}")
+    print(f"\nПеріод: {result['period']}, ключ: '{result['key']}'.")
+    if output_path:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            plain = vigenere_translate(f.read(), result['shifts'], decrypt=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(plain)
+        print(f"Розшифрований текст збережено у файлі '{output_path}'.")
+    else:
+        with open(input_path, 'r', encoding='utf-8') as f:
+            head = f.read(preview * 2)
+        print("Розшифрований текст (початок):")
+        print(vigenere_translate(head, result['shifts'], decrypt=True)[:preview])
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Криптоаналіз шифру Віженера: індекс збігу, тест Касіскі, зсуви стовпців.')
+    parser.add_argument('input', help='файл шифротексту')
+    parser.add_argument('--max-period', type=int, default=MAX_PERIOD, help='найбільший період, що перевіряється')
+    parser.add_argument('--score', choices=['loglik', 'chi2'], default='loglik', help='критерій оцінки зсувів стовпців')
+    parser.add_argument('--output', default=None, help='зберегти розшифрований текст у файл')
+    parser.add_argument('--encrypt', default=None, metavar='KEY',
+                        help='замість аналізу зашифрувати файл ключовим словом KEY (результат у --output або stdout)')
+    args = parser.parse_args()
+    if args.encrypt:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            cipher_text = vigenere_translate(f.read(), args.encrypt)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(cipher_text)
+        else:
+            print(cipher_text, end='')
+    else:
+        try:
+            main(args.input, args.max_period, args.score, args.output)
+        except BrokenPipeError:
+            pass
@@ -0,0 +1,135 @@
+import re
+from collections import deque
+from functools import lru_cache
+
+# Символи, що вважаються частиною слова (літери та апостроф)
+APOSTROPHES = "'’ʼ"
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:[" + APOSTROPHES + r"][^\W\d_]+)*")
+
+def _continues(text, index, step):
+    """
+    Чи продовжується слово символом text[index]: літерою або апострофом
+    всередині слова (за ним у напрямку step іде літера).
+    """
+    if not 0 <= index < len(text):
+        return False
+    char = text[index]
+    if char.isalpha():
+        return True
+    neighbour = index + step
+    return char in APOSTROPHES and 0 <= neighbour < len(text) and text[neighbour].isalpha()
+
+class WordMatcher:
+    """
+    Автомат Ахо–Корасік для словника відомих слів. Будується один раз,
+    після чого будь-який текст проходиться за один прохід незалежно від
+    кількості слів у словнику. Зараховуються лише збіги цілих слів.
+    """
+
+    def __init__(self, words):
+        self.words = sorted({word.lower() for word in words if word})
+        # goto[state] — переходи за символом, fail[state] — суфіксне посилання,
+        # output[state] — номер слова, що закінчується в стані, або -1,
+        # next_output[state] — найближчий стан за суфіксними посиланнями з output != -1
+        self.goto = [{}]
+        self.output = [-1]
+        for index, word in enumerate(self.words):
+            state = 0
+            for char in word:
+                following = self.goto[state].get(char)
+                if following is None:
+                    following = len(self.goto)
+                    self.goto[state][char] = following
+                    self.goto.append({})
+                    self.output.append(-1)
+                state = following
+            self.output[state] = index
+        self.fail = [0] * len(self.goto)
+        self.next_output = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self.goto[state].items():
+                queue.append(following)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[following] = target if target != following else 0
+                link = self.fail[following]
+                self.next_output[following] = link if self.output[link] != -1 else self.next_output[link]
+
+    def __len__(self):
+        return len(self.words)
+
+    def iter_matches(self, text):
+        """
+        Повертає (номер слова, позиція початку) для кожного збігу цілого слова.
+        Текст порівнюється без урахування регістру.
+        """
+        text = text.lower()
+        goto, fail, output, next_output, words = self.goto, self.fail, self.output, self.next_output, self.words
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not state:
+                continue
+            # Збіг зараховується, лише якщо за ним не йде літера
+            if _continues(text, position + 1, 1):
+                continue
+            match = state if output[state] != -1 else next_output[state]
+            while match:
+                index = output[match]
+                start = position - len(words[index]) + 1
+                if not _continues(text, start - 1, -1):
+                    yield index, start
+                match = next_output[match]
+
+    def count_matches(self, text):
+        """
+        Загальна кількість збігів цілих слів у тексті.
+        """
+        return sum(1 for _ in self.iter_matches(text))
+
+    def find_words(self, text):
+        """
+        Множина різних відомих слів, що зустрічаються в тексті як цілі слова.
+        """
+        return {self.words[index] for index, _ in self.iter_matches(text)}
+
+    def contains(self, text):
+        """
+        Чи містить текст хоча б одне відоме слово.
+        """
+        return next(self.iter_matches(text), None) is not None
+
+@lru_cache(maxsize=32)
+def _cached_matcher(words):
+    return WordMatcher(words)
+
+def word_matcher(words):
+    """
+    Повертає (з кешу) автомат для списку слів; готовий WordMatcher повертається без змін.
+    """
+    if isinstance(words, WordMatcher):
+        return words
+    return _cached_matcher(tuple(words))
+
+def extract_words(text, min_count=1):
+    """
+    Виділяє слова з тексту (у нижньому регістрі), що зустрічаються щонайменше min_count разів.
+    """
+    counts = {}
+    for word in WORD_PATTERN.findall(text.lower()):
+        counts[word] = counts.get(word, 0) + 1
+    return [word for word, count in counts.items() if count >= min_count]
+
+def load_word_list(file_path='text1.txt', min_count=1):
+    """
+    Будує словник відомих слів з текстового файлу корпусу.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return extract_words(f.read(), min_count)